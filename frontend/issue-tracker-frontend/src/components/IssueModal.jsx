@@ -1,19 +1,24 @@
 // src/components/IssueModal.js
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect } from 'react';
 import {
     Typography,
     Dialog, DialogTitle, DialogContent, DialogActions,
     TextField, Button, Select, MenuItem, FormControl, InputLabel,
-    CircularProgress, Box, Alert
+    CircularProgress, Box, Alert, Autocomplete
 } from '@mui/material';
 import api from '../services/api'; // Assuming this path is correct
 import { useAuth } from '../context/AuthContext';
 import { useFormik } from 'formik'; // Import useFormik
 import * as yup from 'yup'; // Import yup for validation schema
 
+const USER_SEARCH_DELAY = 250; // ms to wait after the last keystroke before searching the user directory
+
 const IssueModal = ({ open, handleClose, issue, onSave }) => {
     const { user: currentUser } = useAuth();
-    const [users, setUsers] = useState([]);
+    const [users, setUsers] = useState([]); // Current page of the user directory for the typed prefix
+    const [userQuery, setUserQuery] = useState('');
+    const [usersLoading, setUsersLoading] = useState(false);
+    const [assignee, setAssignee] = useState(null); // Selected {id, username}, null for "None"
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState('');
 
@@ -116,44 +121,53 @@ const IssueModal = ({ open, handleClose, issue, onSave }) => {
                     // Use 'NONE' for Select if assigned_to is null, otherwise the ID
                     assigned_to_id: issue.assigned_to?.id ? issue.assigned_to.id : 'NONE',
                 }, false); // false means don't validate immediately on setValues
+                setAssignee(issue.assigned_to || null);
             } else {
                 // Reset form for creating a new issue
                 formik.resetForm();
+                setAssignee(null);
             }
+            setUserQuery('');
             setError(''); // Clear any previous API errors
         }
     }, [issue, open]); // Dependencies: issue object and modal open state
 
-    // Fetch users for the "Assigned To" dropdown
-    const fetchUsers = useCallback(async () => {
-        if (!open) return; // Only fetch if modal is open
-        try {
-            // This endpoint in Django backend allows admins to see all users.
-            // If a regular user can only assign to self or specific team, modify this logic.
-            const response = await api.get('/issues/all_users/');
-            setUsers(response.data);
-        } catch (err) {
-            console.error("Failed to fetch users for assignment:", err.response?.data || err.message);
-            // Don't set a critical error, as not all users might need to be assignable.
-            // The frontend will just show an empty "Assigned To" dropdown if this fails.
-        }
-    }, [open]);
+    // Check if the current user is the owner of the issue being edited or an admin
+    // This controls visibility of the "Assigned To" picker
+    const canAssign = currentUser && (issue?.owner?.id === currentUser.id || currentUser.is_staff);
 
+    // Search the user directory for the "Assigned To" picker as the user types (admins only,
+    // like the old all_users list). Only the first page of matches is loaded, whatever the number of users.
     useEffect(() => {
-        fetchUsers();
-    }, [fetchUsers]);
+        if (!open || !canAssign || !currentUser.is_staff) return;
+        let cancelled = false; // Ignore responses for a prefix the user has typed past
+        const timer = setTimeout(async () => {
+            setUsersLoading(true);
+            try {
+                const response = await api.get('/users/', { params: { q: userQuery, page_size: 20 } });
+                if (!cancelled) setUsers(response.data.results);
+            } catch (err) {
+                console.error("Failed to search users for assignment:", err.response?.data || err.message);
+                // Not critical: the picker just shows no options.
+            } finally {
+                if (!cancelled) setUsersLoading(false);
+            }
+        }, USER_SEARCH_DELAY);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [open, canAssign, currentUser, userQuery]);
 
     // Custom handleClose to reset form when modal is closed (e.g., by clicking outside or cancel button)
     const handleCloseModal = () => {
         formik.resetForm(); // Reset Formik state, including touched and errors
+        setAssignee(null);
+        setUserQuery('');
         setError(''); // Clear any API error messages
         handleClose(); // Call the parent's handleClose prop
     };
 
-    // Check if the current user is the owner of the issue being edited or an admin
-    // This controls visibility of the "Assigned To" dropdown
-    const canAssign = currentUser && (issue?.owner?.id === currentUser.id || currentUser.is_staff);
-
     return (
         <Dialog open={open} onClose={handleCloseModal} fullWidth maxWidth="sm">
             <DialogTitle>{issue ? 'Edit Issue' : 'Create New Issue'}</DialogTitle>
@@ -221,35 +235,38 @@ const IssueModal = ({ open, handleClose, issue, onSave }) => {
                         )}
                     </FormControl>
 
-                    {/* Assigned To Select Field (only visible if canAssign) */}
+                    {/* Assigned To typeahead (only visible if canAssign) */}
                     {canAssign && (
-                        <FormControl fullWidth margin="dense" sx={{ mb: 2 }}
-                            error={formik.touched.assigned_to_id && Boolean(formik.errors.assigned_to_id)}
-                        >
-                            <InputLabel id="assigned-to-label">Assigned To</InputLabel>
-                            <Select
-                                labelId="assigned-to-label"
-                                id="assigned_to_id"
-                                name="assigned_to_id"
-                                value={formik.values.assigned_to_id}
-                                label="Assigned To"
-                                onChange={formik.handleChange}
-                                onBlur={formik.handleBlur}
-                                displayEmpty
-                            >
-                                <MenuItem value="NONE">
-                                    <em>None</em> {/* Changed from 0 to 'NONE' for clarity/consistency */}
-                                </MenuItem>
-                                {users.map(u => (
-                                    <MenuItem key={u.id} value={u.id}>{u.username}</MenuItem>
-                                ))}
-                            </Select>
-                            {formik.touched.assigned_to_id && formik.errors.assigned_to_id && (
-                                <Typography variant="caption" color="error" sx={{ ml: 1.5, mt: 0.5 }}>
-                                    {formik.errors.assigned_to_id}
-                                </Typography>
+                        <Autocomplete
+                            id="assigned_to_id"
+                            // Keep the selected user among the options when the search no longer returns it
+                            options={assignee && !users.some(u => u.id === assignee.id) ? [assignee, ...users] : users}
+                            value={assignee}
+                            onChange={(event, newValue) => {
+                                setAssignee(newValue);
+                                formik.setFieldValue('assigned_to_id', newValue ? newValue.id : 'NONE');
+                            }}
+                            onInputChange={(event, newInputValue, reason) => {
+                                if (reason === 'input' || reason === 'clear') setUserQuery(newInputValue);
+                            }}
+                            filterOptions={(options) => options} // Already filtered by the server
+                            getOptionLabel={(option) => option.username}
+                            isOptionEqualToValue={(option, value) => option.id === value.id}
+                            loading={usersLoading}
+                            noOptionsText="No matching users"
+                            sx={{ mb: 2 }}
+                            renderInput={(params) => (
+                                <TextField
+                                    {...params}
+                                    margin="dense"
+                                    label="Assigned To"
+                                    placeholder="None"
+                                    onBlur={() => formik.setFieldTouched('assigned_to_id', true)}
+                                    error={formik.touched.assigned_to_id && Boolean(formik.errors.assigned_to_id)}
+                                    helperText={formik.touched.assigned_to_id && formik.errors.assigned_to_id}
+                                />
                             )}
-                        </FormControl>
+                        />
                     )}
                 </Box>
             </DialogContent>
@@ -1,8 +1,8 @@
 // src/pages/Dashboard.js
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import {
     Container, Typography, Box, Button, CircularProgress, Alert,
-    ToggleButtonGroup, ToggleButton, Grid
+    ToggleButtonGroup, ToggleButton, Grid, TextField
 } from '@mui/material';
 import AddIcon from '@mui/icons-material/Add';
 import PersonAddIcon from '@mui/icons-material/PersonAdd';
@@ -20,6 +20,19 @@ const ItemTypes = {
 };
 
 const ISSUE_STATUSES = ['OPEN', 'IN_PROGRESS', 'CLOSED'];
+const SYNC_INTERVAL_MS = 30000; // Polling interval, only used without the event stream (no EventSource, or not served through ASGI)
+const EVENTS_RECONNECT_MS = 5000; // Delay before reopening the event stream after an error
+const BOARD_PAGE_SIZE = 10; // Issues loaded per column, more are fetched on demand
+
+// Apply a delta from /issues/changes/ to the current list: drop removed ids, replace changed issues, add new ones
+const mergeIssueChanges = (currentIssues, changedIssues, removedIds, statusFilter) => {
+    const removed = new Set(removedIds);
+    const byId = new Map(currentIssues.filter(issue => !removed.has(issue.id)).map(issue => [issue.id, issue]));
+    changedIssues.forEach(issue => byId.set(issue.id, issue));
+    return Array.from(byId.values())
+        .filter(issue => statusFilter === 'ALL' || issue.status === statusFilter) // The list was loaded with this filter
+        .sort((a, b) => new Date(b.created_at) - new Date(a.created_at) || b.id - a.id); // Same order as the API
+};
 
 const Dashboard = () => {
     const { user, isAuthenticated } = useAuth();
@@ -30,26 +43,51 @@ const Dashboard = () => {
     const [openIssueModal, setOpenIssueModal] = useState(false);
     const [currentIssue, setCurrentIssue] = useState(null);
     const [filterStatus, setFilterStatus] = useState('ALL');
+    const [searchInput, setSearchInput] = useState(''); // Text in the search box
+    const [searchQuery, setSearchQuery] = useState(''); // Search applied to the list (on Enter)
     const [openInviteModal, setOpenInviteModal] = useState(false);
+    const [nextPage, setNextPage] = useState(null); // Cursor URL of the next page of search results, null when everything is loaded
+    const [columns, setColumns] = useState(null); // { STATUS: { count, next } } from /issues/board/, null for search results
+    const [loadingMore, setLoadingMore] = useState(false);
+    const syncToken = useRef(null); // 'next_since' token of the delta sync feed
 
 
-const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
+const fetchIssues = useCallback(async (statusFilter = 'ALL', search = '') => {
     setLoading(true);
     setError('');
     try {
         const endpoint = user?.is_staff ? '/issues/' : '/issues/my_issues/';
         const params = statusFilter !== 'ALL' ? { status: statusFilter } : {};
 
+        // Take the sync token before loading the list, so no change made in between is missed
+        const syncResponse = await api.get('/issues/changes/');
+        syncToken.current = syncResponse.data.next_since;
+
+        if (!search) {
+            // Board view: counts and the first issues of every column in one request
+            const boardResponse = await api.get('/issues/board/', { params: { ...params, page_size: BOARD_PAGE_SIZE } });
+            setIssues(boardResponse.data.columns.flatMap(column => column.issues));
+            setColumns(Object.fromEntries(boardResponse.data.columns.map(
+                column => [column.status, { count: column.count, next: column.next }]
+            )));
+            setNextPage(null);
+            return;
+        }
+
+        params.q = search; // Server-side full-text search, results ranked by relevance
+        setColumns(null);
         const response = await api.get(endpoint, { params });
 
         
-        // DRF backend uses pagination, response.data will be an object
-        // with a 'results' key containing the actual array of issues.
+        // DRF backend uses cursor pagination, response.data will be an object
+        // with a 'results' key containing the actual array of issues and a 'next' cursor URL.
         if (response.data && Array.isArray(response.data.results)) {
             setIssues(response.data.results);
+            setNextPage(response.data.next);
         } else if (Array.isArray(response.data)) {
             // If it's not paginated, it might be a direct array
             setIssues(response.data);
+            setNextPage(null);
         } else {
             // Log if the response structure is unexpected
             console.warn("Unexpected API response structure for issues:", response.data);
@@ -60,19 +98,176 @@ const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
         console.error('Failed to fetch issues:', err.response?.data || err.message);
         setError('Failed to load issues. Please try again.');
         setIssues([]); // Crucial: Ensure 'issues' is reset to an empty array on error
+        setNextPage(null);
+        setColumns(null);
     } finally {
         setLoading(false);
     }
 }, [user]);
 
+// Append the next cursor page; the 'next' URL already carries the status filter and page size
+const loadMoreIssues = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+        const response = await api.get(nextPage);
+        setIssues(prevIssues => {
+            // Skip issues already merged in by a sync
+            const loadedIds = new Set(prevIssues.map(issue => issue.id));
+            return [...prevIssues, ...response.data.results.filter(issue => !loadedIds.has(issue.id))];
+        });
+        setNextPage(response.data.next);
+    } catch (err) {
+        console.error('Failed to load more issues:', err.response?.data || err.message);
+        setError('Failed to load more issues. Please try again.');
+    } finally {
+        setLoadingMore(false);
+    }
+};
+
+// Load the next issues of one board column; its 'next' link continues the cursor-paginated list
+const loadMoreColumn = async (status) => {
+    const columnNext = columns?.[status]?.next;
+    if (!columnNext) return;
+    try {
+        const response = await api.get(columnNext);
+        setIssues(prevIssues => {
+            const loadedIds = new Set(prevIssues.map(issue => issue.id));
+            return [...prevIssues, ...response.data.results.filter(issue => !loadedIds.has(issue.id))];
+        });
+        setColumns(prevColumns => ({ ...prevColumns, [status]: { ...prevColumns[status], next: response.data.next } }));
+    } catch (err) {
+        console.error('Failed to load more issues:', err.response?.data || err.message);
+        setError('Failed to load more issues. Please try again.');
+    }
+};
+
+// Re-read the column counts only, e.g. after merging changes: the per-user counters
+// (one row lookup on the server), or one GROUP BY over the board when filtered by status
+const refreshColumnCounts = useCallback(async (statusFilter = 'ALL') => {
+    try {
+        let counts;
+        if (statusFilter === 'ALL') {
+            const response = await api.get('/issues/counts/');
+            counts = response.data.counts;
+        } else {
+            const response = await api.get('/issues/board/', { params: { page_size: 0, status: statusFilter } });
+            counts = Object.fromEntries(response.data.columns.map(column => [column.status, column.count]));
+        }
+        setColumns(prevColumns => prevColumns && Object.fromEntries(Object.entries(prevColumns).map(
+            ([status, column]) => [status, { ...column, count: counts[status] ?? column.count }]
+        )));
+    } catch (err) {
+        console.error('Failed to refresh issue counts:', err.response?.data || err.message);
+    }
+}, []);
+
+// Pull only what changed since the last sync and merge it into the list instead of reloading everything
+const syncIssues = useCallback(async (statusFilter = 'ALL', search = '') => {
+    if (!syncToken.current || search) {
+        // The delta feed can't tell which changes match a search, so reload search results
+        return fetchIssues(statusFilter, search);
+    }
+    try {
+        let hasMore = true;
+        let changed = false;
+        while (hasMore) {
+            const response = await api.get('/issues/changes/', { params: { since: syncToken.current } });
+            const { results, removed, next_since, has_more } = response.data;
+            setIssues(prevIssues => mergeIssueChanges(prevIssues, results, removed, statusFilter));
+            syncToken.current = next_since;
+            hasMore = has_more;
+            changed = changed || results.length > 0 || removed.length > 0;
+        }
+        if (changed) {
+            refreshColumnCounts(statusFilter);
+        }
+    } catch (err) {
+        if (err.response?.status === 410) {
+            // Token too old for the server's tombstones, start over with a full load
+            syncToken.current = null;
+            return fetchIssues(statusFilter);
+        }
+        console.error('Failed to sync issues:', err.response?.data || err.message);
+    }
+}, [fetchIssues, refreshColumnCounts]);
+
     useEffect(() => {
-        if (isAuthenticated) {
-            fetchIssues(filterStatus);
-            // Polling for real-time updates (can be replaced by WebSockets for better performance)
-            
-            
+        if (!isAuthenticated) return;
+        fetchIssues(filterStatus, searchQuery);
+
+        let intervalId = null;
+        const startPolling = () => {
+            // Only the changes since the last sync are downloaded
+            intervalId = setInterval(() => syncIssues(filterStatus, searchQuery), SYNC_INTERVAL_MS);
+        };
+
+        if (typeof EventSource === 'undefined') {
+            // No Server-Sent Events support: poll
+            startPolling();
+            return () => clearInterval(intervalId);
         }
-    }, [isAuthenticated, filterStatus, fetchIssues]);
+
+        // Real-time updates: one long-lived connection pushes the changes we can see
+        let eventSource = null;
+        let reconnectTimer = null;
+        let reconnecting = false;
+        let closed = false;
+
+        const applyChange = (changedIssues, removedIds) => {
+            if (searchQuery) {
+                syncIssues(filterStatus, searchQuery); // Can't tell locally whether the change matches the search
+                return;
+            }
+            setIssues(prevIssues => mergeIssueChanges(prevIssues, changedIssues, removedIds, filterStatus));
+            refreshColumnCounts(filterStatus);
+        };
+
+        const reconnect = () => {
+            reconnecting = true;
+            reconnectTimer = setTimeout(connect, EVENTS_RECONNECT_MS);
+        };
+
+        const connect = async () => {
+            // EventSource can't send headers: connect with a short-lived stream token, never the access token
+            let token;
+            try {
+                const response = await api.post('/issues/events/token/');
+                token = response.data.token;
+            } catch (err) {
+                if (closed) return;
+                if (err.response?.status === 501) {
+                    startPolling(); // The server doesn't run the event stream (not served through ASGI)
+                } else {
+                    reconnect();
+                }
+                return;
+            }
+            if (closed) return;
+            eventSource = new EventSource(`${api.defaults.baseURL}/issues/events/?token=${encodeURIComponent(token)}`);
+            eventSource.onopen = () => {
+                if (reconnecting) {
+                    syncIssues(filterStatus, searchQuery); // Catch up on what happened while disconnected
+                }
+            };
+            eventSource.addEventListener('upsert', (e) => applyChange([JSON.parse(e.data).issue], []));
+            eventSource.addEventListener('remove', (e) => applyChange([], [JSON.parse(e.data).id]));
+            eventSource.addEventListener('resync', () => syncIssues(filterStatus, searchQuery));
+            eventSource.onerror = () => {
+                // Reconnect ourselves, with a new stream token (the browser would reuse the expired one)
+                eventSource.close();
+                reconnect();
+            };
+        };
+        connect();
+
+        return () => {
+            closed = true;
+            clearTimeout(reconnectTimer);
+            clearInterval(intervalId);
+            if (eventSource) eventSource.close();
+        };
+    }, [isAuthenticated, filterStatus, searchQuery, fetchIssues, syncIssues, refreshColumnCounts]);
 
 
     const handleCreateIssue = () => {
@@ -94,7 +289,7 @@ const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
         if (window.confirm('Are you sure you want to delete this issue?')) {
             try {
                 await api.delete(`/issues/${issueId}/`);
-                fetchIssues(filterStatus);
+                syncIssues(filterStatus, searchQuery);
             } catch (err) {
                 console.error('Failed to delete issue:', err.response?.data || err.message);
                 setError('Failed to delete issue. You can only delete your own issues or be an admin.');
@@ -126,14 +321,16 @@ const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
 
         try {
             await api.patch(`/issues/${id}/`, { status: newStatus });
+            refreshColumnCounts(filterStatus); // The issue moved between columns
         } catch (err) {
             console.error('Failed to update issue status:', err.response?.data || err.message);
             setError('Failed to update issue status on server.');
-            fetchIssues(filterStatus); // Revert to actual state from backend on error
+            fetchIssues(filterStatus, searchQuery); // Revert to actual state from backend on error
         }
-    }, [issues, user, fetchIssues, filterStatus]);
+    }, [issues, user, fetchIssues, refreshColumnCounts, filterStatus, searchQuery]);
 
-    const KanbanColumn = ({ status, issues, moveIssue }) => {
+    // count: server-side total of the column (board view), hasMore: more issues can be loaded for it
+    const KanbanColumn = ({ status, issues, count, hasMore, onLoadMore, moveIssue }) => {
         const [{ isOver, canDrop }, drop] = useDrop(() => ({
             accept: ItemTypes.ISSUE,
             drop: (item) => moveIssue(item.id, status),
@@ -177,7 +374,7 @@ const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
                     }}
                 >
                     <Typography variant="h6" align="center" mb={2} color="primary">
-                        {getColumnTitle(status)} ({issues.length})
+                        {getColumnTitle(status)} ({count ?? issues.length})
                     </Typography>
                     {issues.length === 0 && !isActive ? (
                         <Typography variant="body2" color="text.secondary" align="center">
@@ -193,6 +390,11 @@ const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
                             />
                         ))
                     )}
+                    {hasMore && (
+                        <Button size="small" onClick={() => onLoadMore(status)}>
+                            Load more
+                        </Button>
+                    )}
                 </Box>
             </Grid>
         );
@@ -252,7 +454,19 @@ const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
                     </Box>
                 </Box>
 
-                <Box sx={{ mb: 3 }}>
+                <Box sx={{ mb: 3, display: 'flex', gap: 2, alignItems: 'center', flexWrap: 'wrap' }}>
+                    <TextField
+                        size="small"
+                        label="Search issues"
+                        value={searchInput}
+                        onChange={(e) => setSearchInput(e.target.value)}
+                        onKeyDown={(e) => {
+                            if (e.key === 'Enter') {
+                                setSearchQuery(searchInput.trim()); // Search runs on the server, only on Enter
+                            }
+                        }}
+                        sx={{ minWidth: 260 }}
+                    />
                     <ToggleButtonGroup
                         value={filterStatus}
                         exclusive
@@ -277,16 +491,27 @@ const fetchIssues = useCallback(async (statusFilter = 'ALL') => {
                             key={status}
                             status={status}
                             issues={issuesGroupedByStatus[status]}
+                            count={columns?.[status]?.count}
+                            hasMore={Boolean(columns?.[status]?.next)}
+                            onLoadMore={loadMoreColumn}
                             moveIssue={moveIssue}
                         />
                     ))}
                 </Grid>
 
+                {nextPage && (
+                    <Box sx={{ display: 'flex', justifyContent: 'center', mt: 3 }}>
+                        <Button variant="outlined" onClick={loadMoreIssues} disabled={loadingMore}>
+                            {loadingMore ? <CircularProgress size={24} /> : 'Load More'}
+                        </Button>
+                    </Box>
+                )}
+
                 <IssueModal
                     open={openIssueModal}
                     handleClose={handleCloseIssueModal}
                     issue={currentIssue}
-                    onSave={() => fetchIssues(filterStatus)}
+                    onSave={() => syncIssues(filterStatus, searchQuery)}
                 />
 
                 <InviteTeamMemberModal
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Serve the project through this entry point (e.g. `uvicorn issue_tracker_backend.asgi:application`)
+so the real-time event stream (/api/issues/events/) can hold long-lived connections.
+The issue API's read endpoints run as async views here (settings.ASYNC_ISSUE_VIEWS).
 """
 
 import os
@@ -12,5 +16,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'issue_tracker_backend.settings')
+os.environ.setdefault('ISSUES_ASYNC_VIEWS', '1') # Set ISSUES_ASYNC_VIEWS=0 to use the sync views
+os.environ['ISSUES_SERVED_BY_ASGI'] = '1' # No persistent connections under ASGI, see settings.DATABASES
 
 application = get_asgi_application()
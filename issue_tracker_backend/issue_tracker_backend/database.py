@@ -0,0 +1,41 @@
+"""
+Connection handling of the PostgreSQL aliases (DATABASES in settings.py), from the environment.
+
+- DATABASE_POOL_SIZE > 0: a psycopg connection pool per process (needs psycopg[pool]).
+  Connections go back to the pool after each request and are checked before they are handed out.
+- Otherwise persistent connections, reused across requests for up to DATABASE_CONN_MAX_AGE
+  seconds. Not under ASGI: Django keeps a connection per thread / async context and ASGI
+  requests don't reuse them, so persistent connections would pile up until they age out.
+  Under ASGI the default is 0 (a connection per request), use the pool to reuse connections.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+DEFAULT_CONN_MAX_AGE = 60 # Seconds, WSGI only
+POOL_TIMEOUT = 10 # Seconds to wait for a free connection
+
+
+def connection_settings(environ, asgi=False):
+    """
+    Return (CONN_MAX_AGE, OPTIONS) for the database aliases. `asgi`: served through asgi.py.
+    """
+    pool_size = int(environ.get('DATABASE_POOL_SIZE', 0))
+    if pool_size:
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as exc:
+            raise ImproperlyConfigured('DATABASE_POOL_SIZE needs psycopg_pool: pip install "psycopg[pool]"') from exc
+        return 0, { # CONN_MAX_AGE must be 0 with a pool
+            'pool': {
+                'min_size': min(int(environ.get('DATABASE_POOL_MIN_SIZE', 2)), pool_size),
+                'max_size': pool_size,
+                'timeout': POOL_TIMEOUT,
+                'check': ConnectionPool.check_connection,
+            },
+        }
+
+    conn_max_age = int(environ.get('DATABASE_CONN_MAX_AGE', 0 if asgi else DEFAULT_CONN_MAX_AGE))
+    if asgi and conn_max_age:
+        raise ImproperlyConfigured(
+            'Persistent connections (DATABASE_CONN_MAX_AGE) leak under ASGI, set DATABASE_POOL_SIZE instead.'
+        )
+    return conn_max_age, {}
@@ -10,9 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import copy
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from .database import connection_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,12 +50,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'issues.metrics.RequestMetricsMiddleware', # First, so its timings cover the whole request (Server-Timing header)
+    'issues.compression.CompressionMiddleware', # br/gzip for large bodies, before anything else touching the body
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'issues.routing.ReplicaRoutingMiddleware', # Per-request replica choice and read-your-writes pins
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -74,11 +81,58 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'issue_tracker_backend.wsgi.application'
+ASGI_APPLICATION = 'issue_tracker_backend.asgi.application'
+
+# Fan-out of real-time issue events (issues/realtime.py). The in-process broker needs no external
+# service; swap in a shared broker when running several server processes.
+ISSUE_EVENTS_BROKER = 'issues.realtime.InProcessBroker'
+
+# Requests and queries slower than these are logged as warnings on the 'issues.metrics'
+# logger, with the view name and SQL (see issues/metrics.py).
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 500))
+SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+
+# Responses from this size on are compressed (br or gzip) for clients that accept it, see issues/compression.py
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', 1024))
+
+# Serve the issue API's read endpoints and assign with async views (issues/async_views.py).
+# asgi.py switches this on; WSGI workers keep the sync views.
+ASYNC_ISSUE_VIEWS = os.environ.get('ISSUES_ASYNC_VIEWS') == '1'
+SERVED_BY_ASGI = os.environ.get('ISSUES_SERVED_BY_ASGI') == '1' # Set by asgi.py
+
+# CLOSED issues not updated for this many days are moved to the archive table by
+# `manage.py archive_issues` (see issues/archive.py).
+ISSUE_ARCHIVE_AFTER_DAYS = int(os.environ.get('ISSUE_ARCHIVE_AFTER_DAYS', 180))
+
+
+# Logging
+# Request metrics are JSON lines: slow requests/queries are warnings, set
+# ISSUES_METRICS_LOG_LEVEL=INFO to log every request.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'issues.metrics': {
+            'handlers': ['console'],
+            'level': os.environ.get('ISSUES_METRICS_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Persistent connections (DATABASE_CONN_MAX_AGE, WSGI only) or a psycopg pool per process
+# (DATABASE_POOL_SIZE), see issue_tracker_backend/database.py
+DATABASE_CONN_MAX_AGE, DATABASE_OPTIONS = connection_settings(os.environ, asgi=SERVED_BY_ASGI)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -87,9 +141,93 @@ DATABASES = {
         'PASSWORD': '123',  # Your PostgreSQL password
         'HOST': 'localhost',             # Or your database host (e.g., '127.0.0.1')
         'PORT': '5432',                  # Default PostgreSQL port
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        # The health check replaces a persistent connection the server dropped instead of failing the next request
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': DATABASE_OPTIONS,
     }
 }
 
+# Read replicas (see issues/routing.py): DATABASE_REPLICA_HOSTS=replica-1,replica-2 adds the
+# aliases replica_1, replica_2 with the primary's other settings. Listing the primary's own host
+# gives a stand-in replica to try the routing locally.
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, map(str.strip, os.environ.get('DATABASE_REPLICA_HOSTS', '').split(','))), 1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'OPTIONS': copy.deepcopy(DATABASES['default'].get('OPTIONS', {})), # Own pool
+        'TEST': {'MIRROR': 'default'}, # Tests read the test database through the replica aliases
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ['issues.routing.ReplicaRouter']
+# Seconds a user's reads stay on the primary after they write or their issues change, must
+# exceed the replication lag
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Shared cache of the users behind JWT access tokens, e.g. redis://localhost:6379/1
+AUTH_USER_CACHE_URL = os.environ.get('AUTH_USER_CACHE_URL')
+# Seconds a cached user may be served after a change other server processes weren't told about
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60 if AUTH_USER_CACHE_URL else 10))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Serialized issue list responses, keyed per user (see issues/cache.py).
+    # MAX_ENTRIES bounds the size, the least recently used entries are evicted first.
+    # Use a shared backend (e.g. Redis) with several server processes, so a change made in one
+    # invalidates the entries of all; entries are also keyed on the list ETag, which comes from the database.
+    'issue_lists': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'issue-lists',
+        'TIMEOUT': 300, # Seconds, backstop in case an invalidation is missed
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 4, # Evict 1/4 of the entries when full
+        },
+    },
+    # Users resolved from JWT access tokens (see issues/authentication.py). Entries are dropped
+    # when a user is saved, which only reaches every server process through a shared backend
+    # (AUTH_USER_CACHE_URL). The in-process default is kept short-lived instead: the TIMEOUT is
+    # how long a change made elsewhere (another process, queryset.update()) can go unnoticed.
+    'auth_users': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': AUTH_USER_CACHE_URL,
+        'TIMEOUT': AUTH_USER_CACHE_TTL,
+    } if AUTH_USER_CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-users',
+        'TIMEOUT': AUTH_USER_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    # First pages of common user directory prefixes (see issues/directory.py). Not invalidated,
+    # the short TIMEOUT is how long a new or renamed user can be missing from them.
+    'user_directory': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'user-directory',
+        'TIMEOUT': 30,
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+        },
+    },
+    # Users whose reads are pinned to the primary database (see issues/routing.py). Use a shared
+    # backend (e.g. Redis) with several server processes, or a pin only holds in one of them.
+    'replica_pins': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'replica-pins',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,7 +272,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'issues.authentication.CachedJWTAuthentication', # simplejwt's JWTAuthentication without the per-request user query
         'rest_framework.authentication.SessionAuthentication', # Recommended for browsable API
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -147,7 +285,7 @@ REST_FRAMEWORK = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'issues.authentication.CachedJWTAuthentication', # simplejwt's JWTAuthentication without the per-request user query
         'rest_framework.authentication.SessionAuthentication', # Recommended for browsable API
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -155,6 +293,16 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10, # Optional: For pagination on lists
+    # orjson-backed JSON with the same output as DRF's (see issues/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'issues.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'issues.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 DJOSER = {
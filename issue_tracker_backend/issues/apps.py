@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class IssuesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'issues'
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+        from . import signals # Registers the list cache invalidation receivers
+        from .metrics import install_query_timer
+
+        connection_created.connect(install_query_timer) # Query counts/times per request (issues/metrics.py)
+        for connection in connections.all(initialized_only=True): # Opened before the app was ready
+            install_query_timer(None, connection)
@@ -0,0 +1,150 @@
+# issues/archive.py
+"""
+Hot/archive split for closed issues.
+
+`manage.py archive_issues` moves CLOSED issues not updated for settings.ISSUE_ARCHIVE_AFTER_DAYS
+into the ArchivedIssue table, a batch per transaction:
+- a batch is picked in (updated_at, id) order with FOR UPDATE SKIP LOCKED on PostgreSQL, so
+  issues being edited are skipped (for the next run) instead of waited for;
+- it is copied with one INSERT ... SELECT and removed with one DELETE, so every lock is held
+  for the duration of a batch only.
+Issue ids are kept, so links and client caches stay valid.
+
+Default listings (list, my_issues, board) read the issues table only. ?include_archived=1 reads
+IssueWithArchive, the UNION ALL view of both tables. Changing an archived issue through the API
+restores it to the issues table first (restore_issue), so it is hot again from then on; users who
+can see it but not change it get a 403, as for a hot issue.
+
+The delta sync feed (issues/sync.py) and the issue counters (issues/counters.py) cover hot issues
+only, like the default listings. Archiving writes tombstones as a deletion does, so sync clients
+drop archived issues; restoring stamps updated_at, so the feed sends the issue again.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .cache import invalidate_issue_lists
+from .counters import add_issue, apply_counter_deltas
+from .models import ArchivedIssue, Issue, IssueTombstone, raw_delete
+from .realtime import publish_bulk_event
+
+ARCHIVE_BATCH_SIZE = 1000
+# Moved as is; the search vector is copied on archiving, and recomputed by the trigger on restore
+COLUMNS = ('id', 'title', 'description', 'status', 'owner_id', 'assigned_to_id', 'created_at', 'updated_at')
+INCLUDE_ARCHIVED_VALUES = {'1', 'true', 'yes'}
+
+
+def include_archived(request):
+    """
+    True when the request asks for archived issues too (?include_archived=1).
+    """
+    return request.query_params.get('include_archived', '').strip().lower() in INCLUDE_ARCHIVED_VALUES
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.ISSUE_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def _move_rows(connection, source, target, columns, ids, extra=None):
+    # INSERT INTO target (columns[, extra column]) SELECT columns[, extra value] FROM source WHERE id IN (...)
+    quote = connection.ops.quote_name
+    target_columns = ', '.join(quote(column) for column in columns)
+    source_columns = target_columns
+    params = []
+    if extra is not None:
+        column, value = extra
+        target_columns += f', {quote(column)}'
+        source_columns += ', %s'
+        params.append(value)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target._meta.db_table)} ({target_columns}) '
+            f'SELECT {source_columns} FROM {quote(source._meta.db_table)} WHERE {quote("id")} IN ({placeholders})',
+            params + list(ids),
+        )
+    raw_delete(source.objects.using(connection.alias).filter(pk__in=ids)) # No signals: the issue lives on in the other table
+
+
+def _after_move(rows, sign):
+    # The moved issues leave (sign=-1) or join (sign=1) the default listings and counters of their owners and assignees
+    deltas = Counter()
+    for _, owner_id, assignee_id, status in rows:
+        add_issue(deltas, owner_id, assignee_id, status, sign=sign)
+    apply_counter_deltas(deltas)
+    affected = {owner_id for _, owner_id, _, _ in rows} | {assignee_id for _, _, assignee_id, _ in rows}
+    invalidate_issue_lists(*affected)
+    publish_bulk_event(affected)
+
+
+def _write_tombstones(rows):
+    # One for admins (user NULL) and one for each user who could see the issue, see signals.issue_deleted
+    IssueTombstone.objects.bulk_create(
+        IssueTombstone(issue_id=issue_id, user_id=user_id)
+        for issue_id, owner_id, assignee_id, _ in rows
+        for user_id in {None, owner_id, assignee_id}
+    )
+
+
+def archive_batch(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Archive up to `batch_size` CLOSED issues last updated before `cutoff`, in one transaction.
+    Returns the number of archived issues, 0 when there is nothing left to archive.
+    """
+    using = router.db_for_write(Issue)
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        candidates = (
+            Issue.objects.using(using)
+            .filter(status='CLOSED', updated_at__lt=cutoff)
+            .order_by('updated_at', 'id') # The (updated_at, id) index, oldest first
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        rows = list(candidates.values_list('id', 'owner_id', 'assigned_to_id', 'status')[:batch_size])
+        if rows:
+            ids = [issue_id for issue_id, _, _, _ in rows]
+            _move_rows(connection, Issue, ArchivedIssue, COLUMNS + ('search_vector',), ids,
+                       extra=('archived_at', timezone.now()))
+            _write_tombstones(rows)
+            _after_move(rows, sign=-1)
+    return len(rows)
+
+
+def archive_issues(cutoff, batch_size=ARCHIVE_BATCH_SIZE, on_batch=None):
+    """
+    Archive every CLOSED issue last updated before `cutoff`, batch by batch. Returns the total.
+    """
+    total = 0
+    while True:
+        archived = archive_batch(cutoff, batch_size)
+        if not archived:
+            return total
+        total += archived
+        if on_batch:
+            on_batch(total)
+
+
+def restore_issue(issue_id, user=None):
+    """
+    Move an archived issue back to the issues table. With `user`, only if they may change it
+    (its owner or an admin). Returns True if the issue was restored.
+    """
+    using = router.db_for_write(Issue)
+    with transaction.atomic(using=using):
+        archived = ArchivedIssue.objects.using(using).select_for_update().filter(pk=issue_id)
+        if user is not None and not user.is_staff:
+            archived = archived.filter(owner=user)
+        rows = list(archived.values_list('id', 'owner_id', 'assigned_to_id', 'status'))
+        if not rows:
+            return False
+        _move_rows(connections[using], ArchivedIssue, Issue, COLUMNS, [rows[0][0]])
+        # A change for the sync feed, whose clients dropped the issue on archiving
+        Issue.objects.using(using).filter(pk=rows[0][0]).update(updated_at=timezone.now())
+        _after_move(rows, sign=1)
+    return True
@@ -0,0 +1,165 @@
+# issues/async_views.py
+"""
+Async request path for the issue API, used when the project is served through ASGI
+(settings.ASYNC_ISSUE_VIEWS, switched on by asgi.py).
+
+DRF views are synchronous: under ASGI every request would hold one of the thread pool's
+workers for its whole duration, including the time spent waiting on the database. Here the
+read endpoints (list, retrieve, my_issues, all_users) and assign run on the event loop and use
+Django's async ORM and cache API. Authentication and permission checks are the exact same
+DRF code as the sync views (run through sync_to_async), and every other action still runs
+the sync implementation, so responses are identical.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.response import Response
+
+from .cache import acached_list_response
+from .conditional import aconditional_response, arespond_with_validators, issue_validators
+from .export import NDJSONRenderer, CSVRenderer, astream_export
+from .models import Issue
+from .projection import requested_fields, project_issues
+from .serializers import SimpleUserSerializer
+from .views import ASSIGN_DENIED, IssueViewSet
+from .writes import assign_changes
+
+User = get_user_model()
+
+
+class AsyncViewSetMixin:
+    """
+    Async dispatch for a DRF viewset: coroutine handlers are awaited on the event loop,
+    sync handlers and the auth/permission checks run in a worker thread.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        return markcoroutinefunction(view) # Django awaits the view instead of running it in a thread
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Same steps as APIView.dispatch
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication (the JWT user lookup), permissions and throttles, unchanged
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """
+        Async get_object(): same lookup, 404 and object permission checks.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aissue_rows_response(self, queryset, fields):
+        # The paging runs on the event loop (IssueCursorPagination.apaginate_queryset). Django's async
+        # ORM still runs the query itself in its database thread, so this is no faster than
+        # sync_to_async(paginate_queryset), it keeps the view free of the sync paginator.
+        page = await self.paginator.apaginate_queryset(project_issues(queryset, fields), self.request, view=self)
+        return self.rows_page_response(page, fields)
+
+
+class AsyncIssueViewSet(AsyncViewSetMixin, IssueViewSet):
+    """
+    IssueViewSet with async list, retrieve, my_issues, all_users, export and assign.
+    Serializing on the event loop is safe: owner/assigned_to are always select_related
+    (or projected, see issues/projection.py).
+    """
+
+    async def aget_object(self):
+        try:
+            return await super().aget_object()
+        except Http404:
+            if not await sync_to_async(self.restore_archived_issue)(): # See IssueViewSet.get_object
+                raise
+            return await super().aget_object()
+
+    async def list(self, request, *args, **kwargs):
+        fields = requested_fields(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        async def build_response(etag):
+            return await acached_list_response(request, etag, lambda: self.aissue_rows_response(queryset, fields))
+
+        return await aconditional_response(request, queryset, build_response)
+
+    async def retrieve(self, request, *args, **kwargs):
+        issue = await self.aget_object()
+
+        async def build_response():
+            return Response(self.get_serializer(issue).data)
+
+        return await arespond_with_validators(request, *issue_validators(request, issue), build_response)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    async def my_issues(self, request):
+        fields = requested_fields(request)
+        status_filter = Issue.normalize_status(request.query_params.get('status', None))
+        user_issues = self.apply_search(self.base_queryset().involving(request.user, status=status_filter))
+        async def build_response(etag):
+            return await acached_list_response(request, etag, lambda: self.aissue_rows_response(user_issues, fields))
+
+        return await aconditional_response(request, user_issues, build_response)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    async def all_users(self, request):
+        users = [user async for user in User.objects.order_by('username')]
+        return Response(SimpleUserSerializer(users, many=True).data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    async def export(self, request):
+        rows, encoder = self.export_source()
+        return self.export_response(astream_export(rows, encoder)) # Async iterator, ASGI streams it as it is produced
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    async def assign(self, request, pk=None):
+        response = await sync_to_async(self.lean_update)(assign_changes(request.data)) # See IssueViewSet.partial_update
+        if response is not None:
+            return response
+
+        issue = await self.aget_object()
+
+        if not (issue.owner_id == request.user.id or request.user.is_staff):
+            return Response({"detail": ASSIGN_DENIED}, status=status.HTTP_403_FORBIDDEN)
+
+        assigned_to_id = request.data.get('assigned_to_id')
+        if assigned_to_id is None:
+            issue.assigned_to = None
+        else:
+            try:
+                issue.assigned_to = await User.objects.aget(id=assigned_to_id)
+            except User.DoesNotExist:
+                return Response({"detail": "Assigned user not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        await issue.asave() # Signals (cache invalidation, tombstones, events) run as for save()
+        return Response(self.get_serializer(issue).data)
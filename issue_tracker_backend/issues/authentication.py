@@ -0,0 +1,68 @@
+# issues/authentication.py
+"""
+JWT authentication without the per-request user query.
+
+simplejwt's JWTAuthentication loads the user row for every API request. CachedJWTAuthentication
+keeps the users it resolved in the 'auth_users' cache (settings.CACHES) and runs the same checks
+(active user, revoked token) on the cached copy. Saving or deleting a user drops their entry
+(see issues/signals.py), so deactivation, staff changes and password changes apply to the next
+request handled by the same process, or by any process with a shared cache (AUTH_USER_CACHE_URL).
+
+Entries expire after settings.AUTH_USER_CACHE_TTL seconds (the alias TIMEOUT, also applied
+explicitly here so no backend keeps them longer), which bounds how long a change the cache
+wasn't told about (made in another process with the in-process default, or with
+queryset.update()) can go unnoticed: 10 seconds by default.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_ALIAS = 'auth_users'
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop `user_id` from this process's cache (every process's with AUTH_USER_CACHE_URL); other
+    processes serve their copy for at most AUTH_USER_CACHE_TTL seconds more.
+    """
+    key = _user_key(user_id)
+    caches[USER_CACHE_ALIAS].delete(key)
+    # A concurrent request may load the old row before the change commits and cache it again
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: caches[USER_CACHE_ALIAS].delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Drop-in replacement for JWTAuthentication (settings.REST_FRAMEWORK) that serves users from the cache.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token) # Raises InvalidToken
+
+        cache = caches[USER_CACHE_ALIAS]
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token) # Loads the user and checks it
+            cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+            return user
+
+        # Same checks as JWTAuthentication.get_user, on the cached copy
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,292 @@
+# issues/benchmark.py
+"""
+API benchmark suite (`manage.py bench_api`), run against the seeded dataset (issues/seeding.py).
+
+Every scenario sends real requests through the whole stack (middleware, JWT authentication,
+views, rendering) with Django's test client, in process and on the configured database.
+The admin_* scenarios load the Django admin's issue changelist with a session login instead of
+a JWT. Latency is measured around each request, the query count is read from the Server-Timing
+header (issues/metrics.py) and the response size is the body as sent (compressed or not). Everything runs in one transaction that is rolled back, so writes
+don't change the dataset and runs stay comparable. Commit cost is therefore not included.
+
+With --contention N the write scenarios also run from N concurrent clients against the same
+issue (a hot row), each request in its own committed transaction as in production, and report
+writes per second. The issue's status and assignee are put back afterwards.
+"""
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
+from django.db import connections, router, transaction
+from django.test import override_settings
+from rest_framework.pagination import Cursor
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import CACHE_ALIAS
+from .metrics import percentile
+from .models import Issue
+from .pagination import IssueCursorPagination
+from .seeding import SEED_ADMIN_PREFIX, SEED_PASSWORD, seed_usernames
+
+User = get_user_model()
+
+MIN_REGRESSION_MS = 1.0 # p95 increases below this are noise, whatever the tolerance
+CONTENTION_SCENARIOS = ('patch_status', 'assign') # Run concurrently with --contention
+ADMIN_SITE = 'site' # Scenario client logged in to the Django admin
+ADMIN_CHANGELIST = '/admin/issues/issue/'
+
+
+class BenchmarkSetupError(Exception):
+    pass
+
+
+class UnexpectedResponse(Exception):
+    pass
+
+
+class BenchmarkContext:
+    """
+    The users, tokens and issues the scenarios work on: the busiest seeded user and an admin.
+    """
+
+    def __init__(self):
+        busiest, second, third = seed_usernames(3)
+        users = User.objects.in_bulk([busiest, second, third], field_name='username')
+        admin = User.objects.filter(username__startswith=SEED_ADMIN_PREFIX).order_by('username').first()
+        if len(users) < 3 or admin is None:
+            raise BenchmarkSetupError('No seeded dataset with at least 3 users and an admin, run manage.py seed_issues first.')
+        self.user = users[busiest]
+        self.admin = admin
+        self.assignees = [users[second].pk, users[third].pk]
+        self.user_token = str(AccessToken.for_user(self.user))
+        self.admin_token = str(AccessToken.for_user(admin))
+        self.issue_id = Issue.objects.filter(owner=self.user).order_by('-created_at').values_list('id', flat=True).first()
+        if self.issue_id is None:
+            raise BenchmarkSetupError(f'{busiest} owns no issues, seed more issues.')
+        # A my_issues page from the middle of the user's issues, as reached by scrolling
+        owned = Issue.objects.filter(owner=self.user).order_by('-created_at', '-id')
+        middle = owned.values_list('created_at', flat=True)[owned.count() // 2]
+        paginator = IssueCursorPagination()
+        paginator.base_url = '/api/issues/my_issues/'
+        self.deep_my_issues_url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(middle)))
+
+    def client(self, admin=False):
+        client = APIClient()
+        if admin == ADMIN_SITE:
+            # The seeded admins are staff without model permissions: grant viewing issues
+            # (rolled back with the run) and log in with a session
+            self.admin.user_permissions.add(Permission.objects.get(content_type__app_label='issues', codename='view_issue'))
+            client.force_login(self.admin)
+            return client
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.admin_token if admin else self.user_token}')
+        return client
+
+
+def _clear_list_cache():
+    caches[CACHE_ALIAS].clear()
+
+
+# name: (prepare(context, iteration) before timing, request(context, client, iteration), expected status,
+#        admin client: True for a staff JWT, ADMIN_SITE for a Django admin session)
+SCENARIOS = {
+    'list': (_clear_list_cache, lambda ctx, client, i: client.get('/api/issues/'), 200, False),
+    'list_cached': (None, lambda ctx, client, i: client.get('/api/issues/'), 200, False),
+    # Full pages: rendering cost and response size, as sent, compressed, with users in a side table
+    'list_100': (_clear_list_cache, lambda ctx, client, i: client.get('/api/issues/', {'page_size': 100}), 200, False),
+    'list_100_compressed': (_clear_list_cache, lambda ctx, client, i: client.get(
+        '/api/issues/', {'page_size': 100}, HTTP_ACCEPT_ENCODING='gzip, deflate, br'
+    ), 200, False),
+    'list_100_user_table': (_clear_list_cache, lambda ctx, client, i: client.get(
+        '/api/issues/', {'page_size': 100, 'user_table': 1}
+    ), 200, False),
+    'my_issues': (_clear_list_cache, lambda ctx, client, i: client.get('/api/issues/my_issues/'), 200, False),
+    'my_issues_deep': (_clear_list_cache, lambda ctx, client, i: client.get(ctx.deep_my_issues_url), 200, False),
+    'retrieve': (None, lambda ctx, client, i: client.get(f'/api/issues/{ctx.issue_id}/'), 200, False),
+    'create': (None, lambda ctx, client, i: client.post(
+        '/api/issues/', {'title': f'Benchmark issue {i}', 'description': 'Created by bench_api.'}, format='json'
+    ), 201, False),
+    'patch_status': (None, lambda ctx, client, i: client.patch(
+        f'/api/issues/{ctx.issue_id}/', {'status': ('IN_PROGRESS', 'OPEN')[i % 2]}, format='json'
+    ), 200, False),
+    'assign': (None, lambda ctx, client, i: client.post(
+        f'/api/issues/{ctx.issue_id}/assign/', {'assigned_to_id': ctx.assignees[i % 2]}, format='json'
+    ), 200, False),
+    'all_users': (None, lambda ctx, client, i: client.get('/api/issues/all_users/'), 200, True),
+    'user_directory': (None, lambda ctx, client, i: client.get('/api/users/', {'q': f'seed-user-{i % 10}'}), 200, True),
+    'login': (None, lambda ctx, client, i: client.post(
+        '/api/auth/jwt/create/', {'username': ctx.user.username, 'password': SEED_PASSWORD}, format='json'
+    ), 200, False),
+    'admin_changelist': (None, lambda ctx, client, i: client.get(ADMIN_CHANGELIST), 200, ADMIN_SITE),
+    'admin_search': (None, lambda ctx, client, i: client.get(ADMIN_CHANGELIST, {'q': 'crashes'}), 200, ADMIN_SITE),
+    'admin_filtered': (None, lambda ctx, client, i: client.get(
+        ADMIN_CHANGELIST, {'owner__id__exact': ctx.user.pk, 'status__exact': 'OPEN'}
+    ), 200, ADMIN_SITE),
+}
+
+
+def _query_count(response):
+    # Server-Timing: db;dur=1.2;desc="3 queries", ...
+    for metric in response.get('Server-Timing', '').split(','):
+        name, _, params = metric.strip().partition(';')
+        if name == 'db':
+            return int(params.split('desc="', 1)[1].split(' ', 1)[0])
+    return None
+
+
+def _timing_summary(timings):
+    # Sorts `timings` in place
+    timings.sort()
+    return {
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+    }
+
+
+def run_scenario(context, name, iterations, warmup):
+    prepare, send, expected_status, admin = SCENARIOS[name]
+    client = context.client(admin=admin)
+    timings, queries, sizes = [], [], []
+    for iteration in range(warmup + iterations):
+        if prepare:
+            prepare()
+        started = time.perf_counter()
+        response = send(context, client, iteration)
+        elapsed = time.perf_counter() - started
+        if response.status_code != expected_status:
+            raise UnexpectedResponse(f'{name}: expected {expected_status}, got {response.status_code}: {response.content[:200]!r}')
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(_query_count(response))
+            sizes.append(len(response.content)) # As sent, after compression
+
+    return {
+        'iterations': iterations,
+        **_timing_summary(timings),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(timings[-1], 3),
+        'queries': max(queries) if None not in queries else None,
+        'bytes': max(sizes),
+    }
+
+
+def run_contention(context, name, threads, iterations):
+    """
+    `threads` clients sending `name` at the same issue at once, `iterations` requests each.
+    Requests commit; failed ones (lock timeouts, unexpected statuses) are counted as errors.
+    """
+    _, send, expected_status, admin = SCENARIOS[name]
+    start = threading.Barrier(threads + 1)
+    timings, errors = [], [] # list.append is atomic, the workers share them
+
+    def worker(offset):
+        client = context.client(admin=admin)
+        client.raise_request_exception = False # A locked database answers 500 instead of stopping the run
+        try:
+            start.wait()
+            for iteration in range(offset, offset + iterations):
+                started = time.perf_counter()
+                response = send(context, client, iteration)
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != expected_status:
+                    errors.append(response.status_code)
+        finally:
+            connections.close_all() # This thread's connections
+
+    with ThreadPoolExecutor(threads) as pool:
+        futures = [pool.submit(worker, number * iterations) for number in range(threads)]
+        start.wait()
+        started = time.perf_counter()
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+
+    return {
+        'threads': threads,
+        'requests': len(timings),
+        'errors': len(errors),
+        'writes_per_s': round((len(timings) - len(errors)) / elapsed, 1),
+        **_timing_summary(timings),
+    }
+
+
+def run_contention_benchmarks(scenarios, threads, iterations):
+    context = BenchmarkContext()
+    issue = Issue.objects.get(pk=context.issue_id)
+    try:
+        return {name: run_contention(context, name, threads, iterations) for name in scenarios}
+    finally:
+        # Put the issue back through save(), so caches and counters follow
+        written = Issue.objects.get(pk=context.issue_id)
+        written.status, written.assigned_to_id = issue.status, issue.assigned_to_id
+        written.save()
+
+
+def run_benchmarks(scenarios, iterations, warmup=3, contention=0):
+    """
+    Run `scenarios` (names from SCENARIOS) and return the machine-readable report.
+    `contention`: number of concurrent clients for the write scenarios, 0 to skip them.
+    """
+    using = router.db_for_write(Issue)
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        with transaction.atomic(using=using):
+            context = BenchmarkContext()
+            results = {name: run_scenario(context, name, iterations, warmup) for name in scenarios}
+            transaction.set_rollback(True, using=using) # Leave the dataset as it was
+        meta = {
+            'created_at': datetime.now(dt_timezone.utc).isoformat(),
+            'database': connections[using].vendor,
+            'django': django.get_version(),
+            'users': User.objects.count(),
+            'issues': Issue.objects.count(),
+            'iterations': iterations,
+        }
+        report = {'meta': meta, 'results': results}
+        if contention:
+            report['contention'] = run_contention_benchmarks(
+                [name for name in CONTENTION_SCENARIOS if name in scenarios], contention, iterations
+            )
+    return report
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """
+    Regressions of `report` against a previous report: a p95 more than `tolerance` (0.2 = 20%)
+    slower, more queries, or a write throughput under contention more than `tolerance` lower.
+    Returns a list of messages, empty when nothing regressed.
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        allowed_ms = previous['p95_ms'] * (1 + tolerance) + MIN_REGRESSION_MS
+        if result['p95_ms'] > allowed_ms:
+            regressions.append(f'{name}: p95 {result["p95_ms"]:.2f}ms, baseline {previous["p95_ms"]:.2f}ms')
+        if None not in (result['queries'], previous.get('queries')) and result['queries'] > previous['queries']:
+            regressions.append(f'{name}: {result["queries"]} queries, baseline {previous["queries"]}')
+    for name, result in report.get('contention', {}).items():
+        previous = baseline.get('contention', {}).get(name)
+        if previous is not None and result['writes_per_s'] < previous['writes_per_s'] * (1 - tolerance):
+            regressions.append(f'{name} under contention: {result["writes_per_s"]:.1f} writes/s, baseline {previous["writes_per_s"]:.1f}')
+    return regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2)
+        report_file.write('\n')
@@ -0,0 +1,74 @@
+# issues/board.py
+"""
+Kanban board summary (/api/issues/board/): per-status counts plus the newest issues of each column.
+
+Two queries whatever the board size: a GROUP BY status for the counts, and one windowed query
+(ROW_NUMBER() OVER (PARTITION BY status ...)) for the first rows of every column. Each column
+comes with a 'next' link into the regular cursor-paginated list (/issues/?status=...), so the
+client can load more of one column on demand.
+"""
+from django.db.models import Count, F
+from django.db.models.functions import RowNumber
+from django.db.models.expressions import Window
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .archive import include_archived
+from .models import Issue
+from .pagination import IssueCursorPagination
+
+
+def _column_next_link(request, status, issues, page_size):
+    """
+    Cursor link to the page after `issues` (the first page_size + 1 issues of the column),
+    built with the same paginator as /issues/ so the list endpoint picks up where the board stopped.
+    """
+    if len(issues) <= page_size:
+        return None
+    paginator = IssueCursorPagination()
+    paginator.page_size = page_size
+    paginator.ordering = IssueCursorPagination.ordering
+    params = {'status': status, 'page_size': page_size}
+    if include_archived(request): # The list continues over the same issues as the board
+        params['include_archived'] = 1
+    paginator.base_url = request.build_absolute_uri(reverse('issue-list') + '?' + urlencode(params))
+    # State as if paginator.paginate_queryset() had just returned the first page
+    paginator.cursor = None
+    paginator.page = issues[:page_size]
+    paginator.has_next = True
+    paginator.has_previous = False
+    paginator.next_position = paginator._get_position_from_instance(issues[page_size], paginator.ordering)
+    return paginator.get_next_link()
+
+
+def build_board(request, queryset, page_size, project, serialize):
+    """
+    Summarize `queryset` (the user's visible issues) by status. `project` turns the column
+    queryset into values() rows (with 'id', 'created_at' and 'status'), `serialize` turns a list
+    of rows into response data. page_size=0 returns the counts only (a single query).
+    """
+    counts = dict(queryset.order_by().values_list('status').annotate(count=Count('id')))
+
+    rows = {}
+    if page_size:
+        # One extra row per column tells whether the column has more issues
+        ranked = queryset.annotate(
+            column_position=Window(
+                RowNumber(),
+                partition_by=F('status'),
+                order_by=[F('created_at').desc(), F('id').desc()],
+            )
+        ).filter(column_position__lte=page_size + 1).order_by('status', '-created_at', '-id')
+        for issue in project(ranked):
+            rows.setdefault(issue['status'], []).append(issue)
+
+    columns = []
+    for status, _ in Issue.STATUS_CHOICES:
+        issues = rows.get(status, [])
+        columns.append({
+            'status': status,
+            'count': counts.get(status, 0),
+            'issues': serialize(issues[:page_size]) if page_size else [],
+            'next': _column_next_link(request, status, issues, page_size) if page_size else None,
+        })
+    return {'columns': columns}
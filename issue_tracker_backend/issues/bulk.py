@@ -0,0 +1,143 @@
+# issues/bulk.py
+"""
+Set-based implementations of the bulk endpoints (/issues/bulk_create/ and /issues/bulk/).
+
+A batch costs a handful of queries whatever its size: one SELECT of the targets, one
+UPDATE/DELETE/INSERT, one INSERT of tombstones and one UPDATE of the issue counters.
+QuerySet.update(), bulk_create() and the raw delete bypass the Issue signal receivers, so
+list cache invalidation, counters, delta sync tombstones and the real-time push are done
+here, once per batch.
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Issue, IssueTombstone, raw_delete
+from .cache import invalidate_issue_lists
+from .counters import add_issue, apply_counter_deltas, change_deltas
+from .realtime import publish_bulk_event
+from .serializers import MAX_BULK_ITEMS
+
+User = get_user_model()
+
+
+class AssigneeNotFound(Exception):
+    pass
+
+
+class TooManyIssues(Exception):
+    pass
+
+
+def load_assignees(user_ids):
+    """
+    Fetch the given users with one query, keyed by id. Raises AssigneeNotFound if any is missing.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    users = User.objects.in_bulk(user_ids)
+    if len(users) != len(user_ids):
+        raise AssigneeNotFound()
+    return users
+
+
+def bulk_create_issues(owner, items):
+    """
+    Create all validated `items` (BulkIssueItemSerializer data) for `owner` in one transaction.
+    Returns the created issues with owner/assigned_to set, ready to be serialized without queries.
+    """
+    assignees = load_assignees(item.get('assigned_to_id') for item in items)
+    issues = [
+        Issue(
+            owner=owner,
+            assigned_to=assignees.get(item.get('assigned_to_id')),
+            **{field: value for field, value in item.items() if field != 'assigned_to_id'}
+        )
+        for item in items
+    ]
+    deltas = Counter()
+    for issue in issues:
+        add_issue(deltas, issue.owner_id, issue.assigned_to_id, issue.status)
+    with transaction.atomic():
+        Issue.objects.bulk_create(issues)
+        apply_counter_deltas(deltas)
+        invalidate_issue_lists(owner.pk, *assignees)
+        publish_bulk_event([owner.pk, *assignees])
+    return issues
+
+
+def apply_bulk_action(user, queryset, action, ids=None, status=None, assigned_to_id=None):
+    """
+    Apply `action` ('set_status', 'assign' or 'delete') to the issues of `queryset` (already
+    restricted to what `user` can see, and to the requested ids or filter).
+
+    Returns one result per issue: 'updated' / 'deleted', 'forbidden' when the user is neither
+    the owner nor an admin (same rule as IsOwnerOrReadOnly and assign), and 'not_found' for
+    requested ids the user cannot see.
+    """
+    with transaction.atomic():
+        # One SELECT of the targets, locked so concurrent batches can't interleave
+        targets = list(
+            queryset.select_related(None).order_by('id').select_for_update()
+            .values_list('id', 'owner_id', 'assigned_to_id', 'status')[:MAX_BULK_ITEMS + 1]
+        )
+        if len(targets) > MAX_BULK_ITEMS: # Only possible with a filter, ids are capped by the serializer
+            raise TooManyIssues()
+        allowed = [row for row in targets if user.is_staff or row[1] == user.pk]
+        allowed_ids = [row[0] for row in allowed]
+
+        if action == 'assign' and assigned_to_id is not None:
+            load_assignees([assigned_to_id]) # Raises AssigneeNotFound, like the single assign action
+
+        to_update = Issue.objects.filter(id__in=allowed_ids)
+        tombstones = []
+        deltas = Counter()
+        for _, owner_id, old_assignee, old_status in allowed:
+            if action == 'set_status':
+                after = (owner_id, old_assignee, status)
+            elif action == 'assign':
+                after = (owner_id, assigned_to_id, old_status)
+            else:
+                after = None # Deleted
+            deltas.update(change_deltas((owner_id, old_assignee, old_status), after))
+        if action == 'set_status':
+            to_update.update(status=status, updated_at=timezone.now()) # update() doesn't apply auto_now
+        elif action == 'assign':
+            to_update.update(assigned_to_id=assigned_to_id, updated_at=timezone.now())
+            # Previous assignees who don't own the issue can no longer see it
+            tombstones = [
+                IssueTombstone(issue_id=issue_id, user_id=old_assignee)
+                for issue_id, owner_id, old_assignee, _ in allowed
+                if old_assignee not in (None, owner_id, assigned_to_id)
+            ]
+        elif action == 'delete':
+            # A single DELETE (raw_delete checks that Issue has no reverse relations); the collector
+            # would otherwise load every row and fire the post_delete receivers one issue at a time.
+            raw_delete(to_update)
+            for issue_id, owner_id, old_assignee, _ in allowed:
+                tombstones.extend(
+                    IssueTombstone(issue_id=issue_id, user_id=user_id)
+                    for user_id in {None, owner_id, old_assignee}
+                )
+        if tombstones:
+            IssueTombstone.objects.bulk_create(tombstones)
+        apply_counter_deltas(deltas)
+
+        affected_users = {owner_id for _, owner_id, _, _ in allowed} | {assignee for _, _, assignee, _ in allowed}
+        if action == 'assign':
+            affected_users.add(assigned_to_id)
+        if allowed:
+            invalidate_issue_lists(*affected_users)
+            publish_bulk_event(affected_users)
+
+    done = 'deleted' if action == 'delete' else 'updated'
+    allowed_ids = set(allowed_ids)
+    results = [
+        {'id': issue_id, 'result': done if issue_id in allowed_ids else 'forbidden'}
+        for issue_id, _, _, _ in targets
+    ]
+    if ids is not None:
+        found = {issue_id for issue_id, _, _, _ in targets}
+        results.extend({'id': issue_id, 'result': 'not_found'} for issue_id in dict.fromkeys(ids) if issue_id not in found)
+    return results
@@ -0,0 +1,167 @@
+# issues/cache.py
+"""
+Read-through cache for serialized issue list responses (/api/issues/ and my_issues).
+
+Entries are keyed by user, the full request URL (filters + cursor/page), a per-user
+"version" token and the list's ETag (issues/conditional.py). Invalidation never deletes
+entries, it swaps the version token of every user whose lists changed, so their old entries
+can no longer be addressed and simply age out. The ETag comes from the database, so an entry
+built before a change made in another server process (whose version bump this process's
+cache never saw) isn't served either. The cache alias is bounded (MAX_ENTRIES in
+settings.CACHES), so the backend evicts orphaned and cold entries on its own.
+
+Admins see every issue, so their keys also include the "all" version, which is bumped on
+every change.
+"""
+import threading
+import time
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .routing import ALL_USERS, pin_to_primary
+
+CACHE_ALIAS = 'issue_lists' # See CACHES in settings.py
+ALL_ISSUES = 'all' # Version scope bumped on every change, used for admins who see all issues
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def new_version_token():
+    return f'{int(time.time())}.{uuid.uuid4().hex}'
+
+
+def _version_key(scope):
+    return f'issues:list:version:{scope}'
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def _current_versions(cache, scopes):
+    """
+    Fetch the version token of each scope, creating one if it is missing (never set, expired, or evicted).
+    Tokens expire with the entries (the alias TIMEOUT), so a missed invalidation can't keep
+    stale lists alive for longer than that either.
+    """
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version_token()) # add() so concurrent requests agree on one token
+            versions[key] = cache.get(key)
+    return [str(versions[key]) for key in keys]
+
+
+async def _acurrent_versions(cache, scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, new_version_token())
+            versions[key] = await cache.aget(key)
+    return [str(versions[key]) for key in keys]
+
+
+def _bump_versions(scopes):
+    caches[CACHE_ALIAS].set_many({_version_key(scope): new_version_token() for scope in scopes})
+
+
+def _scopes(user):
+    return [user.pk, ALL_ISSUES] if user.is_staff else [user.pk]
+
+
+def issue_list_versions(user):
+    """
+    The version tokens of `user`'s issue lists, swapped on every change to an issue they can see.
+    """
+    return _current_versions(caches[CACHE_ALIAS], _scopes(user))
+
+
+async def aissue_list_versions(user):
+    return await _acurrent_versions(caches[CACHE_ALIAS], _scopes(user))
+
+
+def _list_key(request, versions, etag):
+    user = request.user
+    # The ETag covers the URL (endpoint, filters, cursor, page size and the host used in 'next' links) and the rows
+    digest = etag.strip('"')
+    return f'issues:list:{user.pk}:{int(user.is_staff)}:{":".join(versions)}:{digest}'
+
+
+def cached_list_response(request, etag, build_response):
+    """
+    Return the cached list response for this user, URL and `etag` (the list's ETag, see
+    issues/conditional.py: conditional_response), or call `build_response()` (the normal DRF
+    list code path) and cache its data if it succeeded.
+    """
+    cache = caches[CACHE_ALIAS]
+    key = _list_key(request, issue_list_versions(request.user), etag)
+
+    data = cache.get(key)
+    if data is not None:
+        _record('hits')
+        return Response(data)
+
+    _record('misses')
+    response = build_response()
+    if response.status_code == 200:
+        cache.set(key, response.data)
+    return response
+
+
+async def acached_list_response(request, etag, abuild_response):
+    """
+    Async variant of cached_list_response (uses the async cache API), `abuild_response` is a coroutine function.
+    """
+    cache = caches[CACHE_ALIAS]
+    key = _list_key(request, await aissue_list_versions(request.user), etag)
+
+    data = await cache.aget(key)
+    if data is not None:
+        _record('hits')
+        return Response(data)
+
+    _record('misses')
+    response = await abuild_response()
+    if response.status_code == 200:
+        await cache.aset(key, response.data)
+    return response
+
+
+def invalidate_issue_lists(*user_ids):
+    """
+    Invalidate the cached lists of the given users (owner, old and new assignee, ...) and of all admins.
+    None entries are ignored, so callers can pass an unset assignee as is.
+    """
+    scopes = {user_id for user_id in user_ids if user_id is not None}
+    scopes.add(ALL_ISSUES)
+    _bump_versions(scopes)
+    # A concurrent request may read the old rows before this transaction commits and cache
+    # them under the new version, so bump again once the change is actually visible.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_versions(scopes))
+    # Keep their reads off the (lagging) replicas for a while, see issues/routing.py
+    pins = {ALL_USERS if scope == ALL_ISSUES else scope for scope in scopes}
+    pin_to_primary(*pins)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: pin_to_primary(*pins)) # The window starts when the change is visible
+
+
+def cache_stats():
+    """
+    Hit/miss counters of this process, used to size the cache.
+    """
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
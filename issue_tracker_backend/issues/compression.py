@@ -0,0 +1,106 @@
+# issues/compression.py
+"""
+Response compression negotiated with Accept-Encoding: brotli (br) when the client accepts it
+and the brotli package is installed, gzip otherwise.
+
+Only bodies of at least settings.RESPONSE_COMPRESSION_MIN_BYTES with a compressible content type
+are compressed; for small bodies the CPU time costs more than the bytes saved. Streaming
+responses (the event stream, exports) are sent as they are, so every chunk still reaches the
+client as soon as it is written. Like Django's GZipMiddleware, gzip output carries a random-length
+file name (BREACH mitigation, see django.utils.text.compress_string) and strong ETags are made
+weak, which the conditional GETs (issues/conditional.py) still match.
+"""
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError: # Optional, gzip only without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript', 'text/')
+BROTLI_QUALITY = 5 # 0-11, higher compresses better but slower; 4-6 suits responses built per request
+GZIP_MAX_RANDOM_BYTES = 100 # As GZipMiddleware
+
+_coding_re = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """
+    {coding: q} of an Accept-Encoding header, e.g. "gzip, br;q=0.8" -> {'gzip': 1.0, 'br': 0.8}.
+    """
+    accepted = {}
+    for part in header.split(','):
+        match = _coding_re.match(part)
+        if match:
+            try:
+                accepted[match.group(1).lower()] = float(match.group(2) or 1)
+            except ValueError:
+                continue
+    return accepted
+
+
+def choose_encoding(header):
+    """
+    The coding to compress with for this Accept-Encoding header, None to send the body as is.
+    Ties go to br, which is smaller for JSON.
+    """
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get('*', 0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best = max(candidates, key=lambda coding: accepted.get(coding, wildcard))
+    return best if accepted.get(best, wildcard) > 0 else None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+class CompressionMiddleware:
+    """
+    Put it right after RequestMetricsMiddleware, before anything else that reads or changes the
+    response body. Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if (response.streaming or response.has_header('Content-Encoding')
+                or len(response.content) < getattr(settings, 'RESPONSE_COMPRESSION_MIN_BYTES', 1024)
+                or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',)) # Compressed or not, the body depends on it
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,119 @@
+# issues/conditional.py
+"""
+ETag / Last-Modified support for issue list, my_issues and detail responses.
+
+List validators come from one aggregate over the filtered list queryset, MAX(updated_at) and
+COUNT(*), never from its rows: any change to a listed issue moves its updated_at, and an issue
+created, deleted, archived or no longer visible changes the count. The aggregate reads the
+database, so every server process agrees on them, and a matching conditional request gets a
+304 before any row is loaded or serialized (or the list cache is looked at). Last-Modified is
+the newest updated_at, with one-second resolution, so clients should prefer If-None-Match.
+
+A single issue is loaded anyway (visibility and permissions), so its validators come from
+the row itself (updated_at); an issue the user can't see is still a 404, whatever the
+request's validators.
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def _etag(request, *parts):
+    # The URL covers filters, cursor and page size; the user covers visibility and is_staff
+    raw = '|'.join([request.build_absolute_uri(), str(request.user.pk), str(int(request.user.is_staff)), *parts])
+    return '"%s"' % hashlib.sha256(raw.encode()).hexdigest()[:32] # Strong validator, quoted as per RFC 9110
+
+
+def _list_state(queryset):
+    # order_by(): the aggregate needs no ordering (nor the joins it may bring)
+    return dict(last_modified=Max('updated_at'), count=Count('pk')), queryset.order_by()
+
+
+def _validators_from_state(request, state):
+    newest = state['last_modified']
+    last_modified = timegm(newest.utctimetuple()) if newest is not None else None # None for an empty list
+    return _etag(request, str(state['count']), newest.isoformat() if newest else ''), last_modified
+
+
+def list_validators(request, queryset):
+    """
+    Return (etag, last_modified) of a list response for this request, `queryset` being the
+    (filtered, unsliced) issues it lists. Runs one aggregate query. `last_modified` is a Unix
+    timestamp, or None for an empty list.
+    """
+    aggregates, queryset = _list_state(queryset)
+    return _validators_from_state(request, queryset.aggregate(**aggregates))
+
+
+async def alist_validators(request, queryset):
+    aggregates, queryset = _list_state(queryset)
+    return _validators_from_state(request, await queryset.aaggregate(**aggregates))
+
+
+def issue_validators(request, issue):
+    """
+    Return (etag, last_modified) of the detail response for `issue`.
+    """
+    return _etag(request, str(issue.pk), issue.updated_at.isoformat()), timegm(issue.updated_at.utctimetuple())
+
+
+def _set_validators(response, etag, last_modified):
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Authorization',)) # Responses differ per user
+
+
+def _not_modified_response(request, etag, last_modified):
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        _set_validators(not_modified, etag, last_modified)
+    return not_modified
+
+
+def respond_with_validators(request, etag, last_modified, build_response):
+    """
+    Return a 304 if the request's If-None-Match / If-Modified-Since match the validators,
+    otherwise call `build_response()` and attach the validators to it.
+    """
+    not_modified = _not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = build_response()
+    if response.status_code == 200:
+        _set_validators(response, etag, last_modified)
+    return response
+
+
+async def arespond_with_validators(request, etag, last_modified, abuild_response):
+    not_modified = _not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = await abuild_response()
+    if response.status_code == 200:
+        _set_validators(response, etag, last_modified)
+    return response
+
+
+def conditional_response(request, queryset, build_response):
+    """
+    Answer a list request conditionally (see respond_with_validators), with the validators of
+    `queryset` (see list_validators). `build_response(etag)` gets the list's ETag, which the
+    list cache (issues/cache.py) keys its entries on.
+    """
+    etag, last_modified = list_validators(request, queryset)
+    return respond_with_validators(request, etag, last_modified, lambda: build_response(etag))
+
+
+async def aconditional_response(request, queryset, abuild_response):
+    """
+    Async variant of conditional_response, `abuild_response` is a coroutine function.
+    """
+    etag, last_modified = await alist_validators(request, queryset)
+    return await arespond_with_validators(request, etag, last_modified, lambda: abuild_response(etag))
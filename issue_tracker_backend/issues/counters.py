@@ -0,0 +1,207 @@
+# issues/counters.py
+"""
+Per-user issue counters by status (IssueCounter), served by /api/issues/counts/.
+
+An issue counts once for its owner, once for its assignee if that's someone else, and once in
+the totals (user NULL, what admins see). The totals are split over IssueCounter.TOTALS_SHARDS
+rows: a write adds to one shard picked at random, so concurrent writes lock different rows
+instead of all queuing on one, and the admin counts are the sum of the shards. Every write
+applies the difference between the issue's counted state before and after, in the same
+transaction as the write:
+- save() and delete() of an issue (API, assign, admin), through the signal receivers;
+- the bulk endpoints, the importer, archiving and restoring, which bypass the signals, with
+  the deltas of the whole batch.
+A batch of deltas is one UPDATE ... SET x_count = x_count + CASE user_id ... END over the
+affected rows. Rows are created with the user (users bulk-created by the importer or the
+seeding get theirs on first use).
+
+Writes that go around all of these (raw SQL, QuerySet.update() elsewhere) leave the counters
+off; `manage.py reconcile_issue_counters` recounts everything and reports the drift.
+"""
+import random
+from collections import Counter, defaultdict
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db import connections, router
+from django.db.models import Count, F, Q, Sum
+
+from .models import Issue, IssueCounter
+
+COUNTER_FIELDS = {'OPEN': 'open_count', 'IN_PROGRESS': 'in_progress_count', 'CLOSED': 'closed_count'}
+TOTALS = None # Key of the totals (all shards)
+UPDATE_CHUNK_SIZE = 100 # Rows per UPDATE, keeps the CASE expressions and the parameter count small
+
+
+def issue_keys(owner_id, assigned_to_id):
+    """
+    Counter rows an issue is counted in: its owner, its assignee (once if the same user) and the totals.
+    """
+    return {user_id for user_id in (owner_id, assigned_to_id) if user_id is not None} | {TOTALS}
+
+
+def add_issue(deltas, owner_id, assigned_to_id, status, sign=1):
+    # Count (sign=1) or uncount (sign=-1) one issue in `deltas`, a Counter of (user key, status)
+    if status in COUNTER_FIELDS:
+        for key in issue_keys(owner_id, assigned_to_id):
+            deltas[key, status] += sign
+    return deltas
+
+
+def change_deltas(before, after):
+    """
+    Deltas of one issue going from `before` to `after`, each (owner_id, assigned_to_id, status) or None.
+    """
+    deltas = Counter()
+    if before is not None:
+        add_issue(deltas, *before, sign=-1)
+    if after is not None:
+        add_issue(deltas, *after)
+    return deltas
+
+
+def queryset_counts(queryset):
+    """
+    Counts of the issues of `queryset` per (user key, status), computed with three GROUP BY queries.
+    """
+    queryset = queryset.order_by()
+    counts = Counter()
+    for owner_id, status, count in queryset.values_list('owner_id', 'status').annotate(Count('id')):
+        counts[owner_id, status] += count
+    assigned = queryset.filter(assigned_to__isnull=False).exclude(assigned_to=F('owner'))
+    for assignee_id, status, count in assigned.values_list('assigned_to_id', 'status').annotate(Count('id')):
+        counts[assignee_id, status] += count
+    for status, count in queryset.values_list('status').annotate(Count('id')):
+        counts[TOTALS, status] += count
+    return Counter({key: count for key, count in counts.items() if key[1] in COUNTER_FIELDS})
+
+
+def _row_filter(key, shard=0):
+    return Q(user__isnull=True, shard=shard) if key is TOTALS else Q(user_id=key)
+
+
+def _update_rows(by_key, keys, shard):
+    # Raw SQL: building the CASE out of When() expressions costs more than running it for large batches
+    connection = connections[router.db_for_write(IssueCounter)]
+    quote = connection.ops.quote_name
+    user_column = quote(IssueCounter._meta.get_field('user').column)
+    shard_column = quote(IssueCounter._meta.get_field('shard').column)
+    assignments, params = [], []
+    for field in COUNTER_FIELDS.values():
+        whens = []
+        for key in keys:
+            delta = by_key[key].get(field)
+            if not delta:
+                continue
+            if key is TOTALS:
+                whens.append(f'WHEN {user_column} IS NULL THEN %s')
+                params.append(delta)
+            else:
+                whens.append(f'WHEN {user_column} = %s THEN %s')
+                params.extend((key, delta))
+        if whens:
+            assignments.append(f'{quote(field)} = {quote(field)} + CASE {" ".join(whens)} ELSE 0 END')
+    if not assignments:
+        return len(keys)
+
+    user_ids = [key for key in keys if key is not TOTALS]
+    conditions = [f'{user_column} IN ({", ".join(["%s"] * len(user_ids))})'] if user_ids else []
+    if TOTALS in keys:
+        conditions.append(f'({user_column} IS NULL AND {shard_column} = %s)')
+        user_ids.append(shard)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {quote(IssueCounter._meta.db_table)} SET {", ".join(assignments)} WHERE {" OR ".join(conditions)}',
+            params + user_ids,
+        )
+        return cursor.rowcount
+
+
+def _create_missing_rows(keys, shard):
+    rows = IssueCounter.objects.filter(reduce(or_, (_row_filter(key, shard) for key in keys)))
+    existing = set(rows.values_list('user_id', flat=True))
+    missing = [key for key in keys if key not in existing]
+    # The unique constraints (user, totals shard) turn concurrent creations into no-ops
+    IssueCounter.objects.bulk_create(
+        [IssueCounter(user_id=key, shard=shard if key is TOTALS else 0) for key in missing], ignore_conflicts=True,
+    )
+    return missing
+
+
+def apply_counter_deltas(deltas):
+    """
+    Add `deltas` ({(user key, status): change}) to the counters. Call it inside the transaction of the write.
+    """
+    by_key = defaultdict(dict)
+    for (key, status), delta in deltas.items():
+        if delta:
+            field = COUNTER_FIELDS[status]
+            by_key[key][field] = by_key[key].get(field, 0) + delta
+    shard = random.randrange(IssueCounter.TOTALS_SHARDS) # Totals row of this write
+    keys = iter(by_key)
+    while chunk := list(islice(keys, UPDATE_CHUNK_SIZE)):
+        if _update_rows(by_key, chunk, shard) < len(chunk): # Users (or the shard) without a row yet
+            missing = _create_missing_rows(chunk, shard)
+            _update_rows(by_key, missing, shard)
+
+
+def counts_for(user):
+    """
+    {status: count} of the issues `user` sees, from their counter row (the sum of the totals shards for admins).
+    """
+    if user.is_staff:
+        totals = IssueCounter.objects.filter(user__isnull=True).aggregate(
+            **{field: Sum(field) for field in COUNTER_FIELDS.values()}
+        )
+        return {status: totals[field] or 0 for status, field in COUNTER_FIELDS.items()}
+    row = IssueCounter.objects.filter(user_id=user.pk).first()
+    return {status: getattr(row, field) if row else 0 for status, field in COUNTER_FIELDS.items()}
+
+
+def reconcile_counters(fix=True):
+    """
+    Recount every counter from the issues table. Returns the drift, {(user key, status): (stored, actual)},
+    and with `fix` overwrites the wrong counts (drifted totals go to shard 0, the other shards to 0).
+    Run it in a transaction (see the command).
+    """
+    actual = queryset_counts(Issue.objects.all())
+    rows, shards = {}, []
+    for row in IssueCounter.objects.order_by('shard', 'pk'):
+        if row.user_id is TOTALS:
+            shards.append(row)
+        else:
+            rows[row.user_id] = row
+    stored = Counter({
+        (key, status): getattr(row, field)
+        for key, row in rows.items() for status, field in COUNTER_FIELDS.items()
+    })
+    for row in shards:
+        for status, field in COUNTER_FIELDS.items():
+            stored[TOTALS, status] += getattr(row, field)
+    drift = {
+        key: (stored[key], actual[key])
+        for key in set(stored) | set(actual)
+        if stored[key] != actual[key]
+    }
+
+    if fix:
+        changed = {}
+        for key, status in drift:
+            if key is TOTALS:
+                for row in shards:
+                    setattr(row, COUNTER_FIELDS[status], 0)
+                    changed[TOTALS, row.shard] = row
+                if not shards or shards[0].shard != 0:
+                    shards.insert(0, IssueCounter(user_id=None, shard=0))
+                setattr(shards[0], COUNTER_FIELDS[status], actual[key, status])
+                changed[TOTALS, 0] = shards[0]
+            else:
+                if key not in rows:
+                    rows[key] = IssueCounter(user_id=key)
+                setattr(rows[key], COUNTER_FIELDS[status], actual[key, status])
+                changed[key, 0] = rows[key]
+        changed = list(changed.values())
+        IssueCounter.objects.bulk_update([row for row in changed if row.pk], list(COUNTER_FIELDS.values()), batch_size=1000)
+        IssueCounter.objects.bulk_create([row for row in changed if not row.pk])
+    return drift
@@ -0,0 +1,78 @@
+# issues/directory.py
+"""
+User directory for assignee pickers: /api/users/?q=ali
+
+- Prefix typeahead on the lowercased username. The prefix becomes a range on the
+  (LOWER(username), id) index from migration 0006, compared in code point order
+  (COLLATE "C" on PostgreSQL, SQLite's default BINARY), so a lookup is a short index range
+  scan whatever the number of users.
+- Keyset pages in the same order (see UserDirectoryPagination).
+- Rows are just {id, username}.
+
+First pages of the most common prefixes (up to CACHED_PREFIX_LENGTH characters, the ones
+every picker asks for while the user starts typing) are cached for a short while.
+New and renamed users can take up to the cache TIMEOUT (settings.CACHES) to appear there.
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connections, router
+from django.db.models.functions import Collate, Lower
+
+User = get_user_model()
+
+DIRECTORY_CACHE_ALIAS = 'user_directory' # See CACHES in settings.py
+CACHED_PREFIX_LENGTH = 3
+DIRECTORY_FIELDS = ('id', 'username')
+MAX_CODE_POINT = 0x10FFFF
+
+
+def username_key(using):
+    # Lowercased username in code point order, the expression of the prefix index
+    key = Lower('username')
+    if connections[using].vendor == 'postgresql':
+        key = Collate(key, 'C')
+    return key
+
+
+def prefix_range(prefix):
+    """
+    (lower, upper) bounds of the keys starting with `prefix`: 'ab' -> ('ab', 'ac'). upper is None when unbounded.
+    """
+    last = ord(prefix[-1])
+    if last == MAX_CODE_POINT:
+        return prefix, None
+    return prefix, prefix[:-1] + chr(last + 1)
+
+
+def directory_queryset(prefix=''):
+    using = router.db_for_read(User)
+    queryset = User.objects.using(using).filter(is_active=True).annotate(username_key=username_key(using))
+    prefix = prefix.strip().lower()
+    if prefix:
+        lower, upper = prefix_range(prefix)
+        queryset = queryset.filter(username_key__gte=lower)
+        if upper is not None:
+            queryset = queryset.filter(username_key__lt=upper)
+    return queryset.values('username_key', *DIRECTORY_FIELDS)
+
+
+def directory_rows(rows):
+    return [{name: row[name] for name in DIRECTORY_FIELDS} for row in rows]
+
+
+def cached_directory_page(request, prefix, build_data):
+    """
+    Data of the first page for short prefixes, from the cache when possible. Other pages aren't cached.
+    """
+    if len(prefix.strip()) > CACHED_PREFIX_LENGTH or request.query_params.get('cursor'):
+        return build_data()
+    # The absolute URL covers the prefix, page size and the host used in 'next' links
+    key = f'users:directory:{hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()}'
+    cache = caches[DIRECTORY_CACHE_ALIAS]
+    data = cache.get(key)
+    if data is None:
+        data = build_data()
+        cache.set(key, data)
+    return data
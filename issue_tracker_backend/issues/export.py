@@ -0,0 +1,131 @@
+# issues/export.py
+"""
+Streaming export of issues (/api/issues/export/?format=ndjson|csv).
+
+Rows come from a server-side cursor (QuerySet.iterator / aiterator with EXPORT_CHUNK_SIZE)
+and are encoded and sent as they arrive, so memory stays flat however many issues are
+exported. Rows are rendered by the fast read path (issues/projection.py): NDJSON lines hold
+exactly the objects of the list endpoint, CSV flattens owner/assignee into
+owner_id, owner_username, owner_email (empty when unassigned).
+"""
+import csv
+
+from rest_framework.renderers import BaseRenderer
+
+from .projection import USER_FIELDS, USER_RELATIONS, issue_row_renderer
+from .renderers import FastJSONRenderer
+
+EXPORT_CHUNK_SIZE = 2000 # Rows fetched per round trip from the server-side cursor
+EXPORT_FLUSH_ROWS = 500 # Rows encoded per chunk written to the client
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Selected by ?format=ndjson. Exports are streamed by the view; this only renders error responses.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return FastJSONRenderer().render(data) + b'\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Selected by ?format=csv. Exports are streamed by the view; this only renders error responses.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict):
+            return FastJSONRenderer().render(data)
+        writer = csv.writer(_Echo())
+        return (writer.writerow(data.keys()) + writer.writerow(data.values())).encode()
+
+
+class _Echo:
+    # csv.writer target that hands the encoded line back instead of storing it
+    def write(self, value):
+        return value
+
+
+class NDJSONEncoder:
+    def __init__(self, fields):
+        self.render = issue_row_renderer(fields)
+        self.json = FastJSONRenderer() # Same JSON encoding as the REST responses
+
+    def header(self):
+        return b''
+
+    def encode(self, row):
+        return self.json.render(self.render(row)) + b'\n'
+
+
+class CSVEncoder:
+    def __init__(self, fields):
+        self.fields = fields
+        self.render = issue_row_renderer(fields)
+        self.writer = csv.writer(_Echo())
+
+    def header(self):
+        columns = []
+        for name in self.fields:
+            if name in USER_RELATIONS:
+                columns.extend(f'{name}_{user_field}' for user_field in USER_FIELDS)
+            else:
+                columns.append(name)
+        return self.writer.writerow(columns).encode()
+
+    def encode(self, row):
+        issue = self.render(row)
+        values = []
+        for name in self.fields:
+            if name in USER_RELATIONS:
+                user = issue[name] or {}
+                values.extend(user.get(user_field, '') for user_field in USER_FIELDS)
+            else:
+                values.append('' if issue[name] is None else issue[name])
+        return self.writer.writerow(values).encode()
+
+
+EXPORT_ENCODERS = {
+    'ndjson': NDJSONEncoder,
+    'csv': CSVEncoder,
+}
+
+
+def stream_export(rows, encoder):
+    """
+    Encode `rows` (a values() queryset) chunk by chunk; for WSGI and the sync views.
+    """
+    header = encoder.header()
+    if header:
+        yield header # Sent before the query runs
+    lines = []
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        lines.append(encoder.encode(row))
+        if len(lines) == EXPORT_FLUSH_ROWS:
+            yield b''.join(lines)
+            lines = []
+    if lines:
+        yield b''.join(lines)
+
+
+async def astream_export(rows, encoder):
+    """
+    Async variant of stream_export; under ASGI a sync iterator would be read whole before sending.
+    """
+    header = encoder.header()
+    if header:
+        yield header
+    lines = []
+    async for row in rows.aiterator(chunk_size=EXPORT_CHUNK_SIZE):
+        lines.append(encoder.encode(row))
+        if len(lines) == EXPORT_FLUSH_ROWS:
+            yield b''.join(lines)
+            lines = []
+    if lines:
+        yield b''.join(lines)
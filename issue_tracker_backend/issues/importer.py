@@ -0,0 +1,246 @@
+# issues/importer.py
+"""
+Bulk import of issues from CSV or JSONL streams (`manage.py import_issues`).
+
+Records are read one at a time and inserted in batches, each in its own transaction:
+- Owner and assignee usernames resolve through one {username: id} map loaded up front.
+  Users created with create_users are added to it.
+- On PostgreSQL (psycopg 3) a batch is written with COPY, elsewhere with bulk_create().
+  The search vector trigger fills in search_vector either way.
+- The IssueImport row is advanced in the same transaction as the batch. A failed or
+  interrupted import resumes after its last committed batch, and no issue is imported twice.
+
+Records use the field names of the export (issues/export.py): title, description, status,
+owner / owner_username, assigned_to / assigned_to_username, created_at, updated_at. Nested
+owner/assigned_to objects from an NDJSON export work as well. Timestamps are kept when present.
+"""
+import csv
+import json
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import invalidate_issue_lists
+from .counters import add_issue, apply_counter_deltas
+from .models import Issue, IssueImport
+from .realtime import publish_bulk_event
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 5000
+COPY_COLUMNS = ('title', 'description', 'status', 'owner_id', 'assigned_to_id', 'created_at', 'updated_at')
+VALID_STATUSES = {value for value, _ in Issue.STATUS_CHOICES}
+TITLE_MAX_LENGTH = Issue._meta.get_field('title').max_length
+
+
+class RecordError(ValueError):
+    pass
+
+
+class ImportAlreadyCompleted(Exception):
+    pass
+
+
+def read_records(stream, input_format):
+    """
+    Yield the records of `stream` one by one: dicts for CSV, raw lines for JSONL (parsed in parse_record,
+    so a broken line is rejected instead of stopping the import).
+    """
+    if input_format == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield line
+
+
+def _username(record, relation):
+    value = record.get(relation) or record.get(f'{relation}_username')
+    if isinstance(value, dict): # Nested user from an NDJSON export
+        value = value.get('username')
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _datetime(record, name):
+    value = record.get(name)
+    if not value:
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise RecordError(f'Invalid {name}: {value!r}.')
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def _as_dict(record):
+    if isinstance(record, dict):
+        return record
+    try:
+        record = json.loads(record)
+    except ValueError as exc:
+        raise RecordError(f'Invalid JSON: {exc}.')
+    if not isinstance(record, dict):
+        raise RecordError('Expected a JSON object.')
+    return record
+
+
+def parse_record(record, user_ids, now):
+    """
+    Turn one input record into the column values of an issue (COPY_COLUMNS order).
+    Raises RecordError when the record can't be imported.
+    """
+    record = _as_dict(record)
+    title = record.get('title')
+    if title is not None and not isinstance(title, str): # JSON numbers, lists, objects
+        raise RecordError(f'Invalid title: {title!r}.')
+    title = (title or '').strip()
+    if not title:
+        raise RecordError('Missing title.')
+    if len(title) > TITLE_MAX_LENGTH:
+        raise RecordError(f'Title longer than {TITLE_MAX_LENGTH} characters.')
+    description = record.get('description')
+    if description is not None and not isinstance(description, str):
+        raise RecordError(f'Invalid description: {description!r}.')
+
+    status = Issue.normalize_status(record.get('status')) or 'OPEN'
+    if status not in VALID_STATUSES:
+        raise RecordError(f'Unknown status: {record.get("status")!r}.')
+
+    owner = _username(record, 'owner')
+    if owner is None:
+        raise RecordError('Missing owner.')
+    if owner not in user_ids:
+        raise RecordError(f'Unknown owner: {owner!r}.')
+    assignee = _username(record, 'assigned_to')
+    if assignee is not None and assignee not in user_ids:
+        raise RecordError(f'Unknown assignee: {assignee!r}.')
+
+    created_at = _datetime(record, 'created_at') or now
+    updated_at = _datetime(record, 'updated_at') or created_at
+    return (
+        title,
+        description,
+        status,
+        user_ids[owner],
+        user_ids[assignee] if assignee else None,
+        created_at,
+        updated_at,
+    )
+
+
+def _create_missing_users(records, user_ids):
+    usernames = set()
+    for record in records:
+        try:
+            record = _as_dict(record)
+        except RecordError:
+            continue # Rejected later by parse_record
+        usernames.update(name for name in (_username(record, 'owner'), _username(record, 'assigned_to')) if name)
+    missing = usernames - user_ids.keys()
+    if missing:
+        password = make_password(None) # Unusable, the users reset their password to log in
+        User.objects.bulk_create([User(username=name, password=password) for name in missing], ignore_conflicts=True)
+        user_ids.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+
+
+def _copy_rows(connection, rows):
+    table = connection.ops.quote_name(Issue._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(Issue._meta.get_field(name).column) for name in COPY_COLUMNS)
+    with connection.cursor() as cursor:
+        with cursor.copy(f'COPY {table} ({columns}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def _insert_rows(connection, rows):
+    issues = Issue.objects.using(connection.alias).bulk_create([Issue(**dict(zip(COPY_COLUMNS, row))) for row in rows])
+    # bulk_create() stamped created_at/updated_at with "now" (auto_now_add/auto_now), the imported
+    # values are written over them in the same transaction
+    quote, adapt = connection.ops.quote_name, connection.ops.adapt_datetimefield_value
+    created_at, updated_at = (quote(Issue._meta.get_field(name).column) for name in ('created_at', 'updated_at'))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {quote(Issue._meta.db_table)} SET {created_at} = %s, {updated_at} = %s WHERE {quote(Issue._meta.pk.column)} = %s',
+            [(adapt(row[5]), adapt(row[6]), issue.pk) for issue, row in zip(issues, rows)],
+        )
+
+
+def use_copy(using):
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3 # psycopg 2 has no row-level COPY API
+
+
+def import_issues(records, source, batch_size=DEFAULT_BATCH_SIZE, copy=None, create_users=False,
+                  restart=False, on_batch=None, on_reject=None):
+    """
+    Import `records` (see read_records) under the import id `source`, resuming a previous run.
+    `copy`: None picks COPY when available. `on_batch(progress, records_read)` is called after
+    every committed batch (records_read counts this run only), `on_reject(record_number, error)` for every rejected record.
+    Returns the IssueImport row.
+    """
+    using = router.db_for_write(Issue)
+    if copy is None:
+        copy = use_copy(using)
+    if restart:
+        IssueImport.objects.filter(source=source).delete()
+    progress, _ = IssueImport.objects.get_or_create(source=source)
+    if progress.completed_at is not None:
+        raise ImportAlreadyCompleted(source)
+
+    user_ids = dict(User.objects.values_list('username', 'id')) # The one lookup map for all records
+    record_number = progress.records_done
+    records_read = 0
+    records = islice(records, progress.records_done, None) # Skip what earlier runs committed
+
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        if create_users:
+            _create_missing_users(batch, user_ids)
+
+        now = timezone.now()
+        rows = []
+        for record in batch:
+            record_number += 1
+            try:
+                rows.append(parse_record(record, user_ids, now))
+            except RecordError as error:
+                if on_reject:
+                    on_reject(record_number, error)
+
+        with transaction.atomic(using=using):
+            if rows:
+                if copy:
+                    _copy_rows(connections[using], rows)
+                else:
+                    _insert_rows(connections[using], rows)
+                # Imported issues bypass the signals, like the bulk endpoints (see issues/bulk.py)
+                deltas = Counter()
+                for row in rows:
+                    add_issue(deltas, row[3], row[4], row[2])
+                apply_counter_deltas(deltas)
+                affected = {row[3] for row in rows} | {row[4] for row in rows}
+                invalidate_issue_lists(*affected)
+                publish_bulk_event(affected)
+            IssueImport.objects.filter(pk=progress.pk).update(
+                records_done=F('records_done') + len(batch),
+                issues_created=F('issues_created') + len(rows),
+                records_rejected=F('records_rejected') + len(batch) - len(rows),
+            )
+        records_read += len(batch)
+        progress.refresh_from_db()
+        if on_batch:
+            on_batch(progress, records_read)
+
+    IssueImport.objects.filter(pk=progress.pk).update(completed_at=timezone.now())
+    progress.refresh_from_db()
+    return progress
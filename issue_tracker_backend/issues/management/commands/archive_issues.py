@@ -0,0 +1,46 @@
+# issues/management/commands/archive_issues.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from issues.archive import ARCHIVE_BATCH_SIZE, archive_cutoff, archive_issues, restore_issue
+
+
+class Command(BaseCommand):
+    help = (
+        'Move CLOSED issues not updated for --older-than-days days to the archive table, in batches '
+        '(see issues/archive.py). --restore ID moves archived issues back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help=f'Default: settings.ISSUE_ARCHIVE_AFTER_DAYS ({settings.ISSUE_ARCHIVE_AFTER_DAYS}).')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Issues per transaction.')
+        parser.add_argument('--restore', type=int, action='append', default=[], metavar='ID',
+                            help='Restore this archived issue instead of archiving, repeatable.')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            for issue_id in options['restore']:
+                if not restore_issue(issue_id):
+                    raise CommandError(f'Issue {issue_id} is not archived.')
+                self.stdout.write(f'Restored issue {issue_id}.')
+            return
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        cutoff = archive_cutoff(options['older_than_days'])
+        started = time.monotonic()
+
+        def on_batch(total):
+            self.stdout.write(f'{total} issues archived')
+
+        archived = archive_issues(
+            cutoff, batch_size=options['batch_size'],
+            on_batch=on_batch if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} closed issues last updated before {cutoff:%Y-%m-%d %H:%M} '
+            f'in {time.monotonic() - started:.1f}s.'
+        ))
@@ -0,0 +1,69 @@
+# issues/management/commands/bench_api.py
+from django.core.management.base import BaseCommand, CommandError
+
+from issues.benchmark import (
+    SCENARIOS, BenchmarkSetupError, UnexpectedResponse, compare_with_baseline, load_report,
+    run_benchmarks, save_report,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'API benchmark suite: times list, retrieve, create, update, assign, login and admin changelist requests '
+        'against the dataset of seed_issues, writes the results as JSON and fails on regressions against a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests before each scenario.')
+        parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), dest='scenarios',
+                            help='Scenario to run, repeatable (default: all).')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Results of an earlier run to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95 slowdown against the baseline, 0.2 = 20%%.')
+        parser.add_argument('--contention', type=int, default=0, metavar='CLIENTS',
+                            help='Also run the write scenarios from this many concurrent clients against one issue '
+                                 '(committed, the issue is put back afterwards).')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+        if options['contention'] < 0:
+            raise CommandError('--contention must not be negative.')
+        baseline = load_report(options['baseline']) if options['baseline'] else None
+
+        try:
+            report = run_benchmarks(
+                options['scenarios'] or list(SCENARIOS), options['iterations'], options['warmup'], options['contention'],
+            )
+        except (BenchmarkSetupError, UnexpectedResponse) as error:
+            raise CommandError(str(error))
+
+        meta = report['meta']
+        self.stdout.write(f"{meta['database']}, {meta['users']} users, {meta['issues']} issues, {meta['iterations']} iterations")
+        self.stdout.write(f"{'scenario':20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'queries':>8} {'bytes':>9}")
+        for name, result in report['results'].items():
+            self.stdout.write(
+                f"{name:20} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} "
+                f"{result['mean_ms']:9.2f} {result['queries'] if result['queries'] is not None else '-':>8} "
+                f"{result['bytes']:>9}"
+            )
+        if report.get('contention'):
+            self.stdout.write(f"Under contention, {options['contention']} concurrent clients on one issue:")
+            self.stdout.write(f"{'scenario':20} {'writes/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+            for name, result in report['contention'].items():
+                self.stdout.write(
+                    f"{name:20} {result['writes_per_s']:9.1f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+                    f"{result['p99_ms']:9.2f} {result['errors']:>8}"
+                )
+
+        if options['output']:
+            save_report(report, options['output'])
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if baseline is not None:
+            regressions = compare_with_baseline(report, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
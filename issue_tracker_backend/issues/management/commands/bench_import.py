@@ -0,0 +1,59 @@
+# issues/management/commands/bench_import.py
+import csv
+import os
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import router
+
+from issues.importer import DEFAULT_BATCH_SIZE, import_issues, read_records, use_copy
+from issues.models import IssueImport
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Import-rate benchmark for import_issues: imports a generated CSV with bulk_create() '
+        '(and COPY on PostgreSQL), then deletes the generated users and issues.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Issues to import per run.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        usernames = [f'bench-import-{i}' for i in range(50)]
+        User.objects.filter(username__in=usernames).delete() # Leftovers of an interrupted run
+        User.objects.bulk_create([User(username=name) for name in usernames])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'issues.csv')
+            with open(path, 'w', newline='', encoding='utf-8') as output:
+                writer = csv.writer(output)
+                writer.writerow(['title', 'description', 'status', 'owner', 'assigned_to', 'created_at'])
+                for i in range(rows):
+                    writer.writerow([
+                        f'Imported issue {i}', 'Steps to reproduce: ' * 5, ('OPEN', 'IN_PROGRESS', 'CLOSED')[i % 3],
+                        usernames[i % 50], usernames[(i * 7) % 50] if i % 4 else '', '2024-01-01T12:00:00Z',
+                    ])
+
+            variants = [('bulk_create', False)]
+            if use_copy(router.db_for_write(IssueImport)):
+                variants.append(('COPY', True))
+            try:
+                for name, copy in variants:
+                    with open(path, newline='', encoding='utf-8') as stream:
+                        started = time.perf_counter()
+                        progress = import_issues(
+                            read_records(stream, 'csv'), f'bench-import-{name}',
+                            batch_size=options['batch_size'], copy=copy, restart=True,
+                        )
+                        elapsed = time.perf_counter() - started
+                    self.stdout.write(f'{name:12} {progress.issues_created} issues in {elapsed:.2f}s: {rows / elapsed:12,.0f} issues/s')
+            finally:
+                User.objects.filter(username__in=usernames).delete() # Cascades to the imported issues
+                IssueImport.objects.filter(source__startswith='bench-import-').delete()
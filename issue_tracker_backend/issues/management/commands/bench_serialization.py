@@ -0,0 +1,62 @@
+# issues/management/commands/bench_serialization.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from issues.models import Issue
+from issues.projection import ISSUE_FIELDS, project_issues, issue_rows
+from issues.serializers import IssueSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Microbenchmark: rows per second rendered by IssueSerializer vs the values() fast read path '
+        '(issues/projection.py). Works on throwaway rows in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Issues to render per run.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per variant, the best one is reported.')
+        parser.add_argument('--fields', default=','.join(ISSUE_FIELDS), help='Fields for the fast path, like ?fields=.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        fields = tuple(name for name in ISSUE_FIELDS if name in options['fields'].split(','))
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                User(username=f'bench-serialization-{i}', email=f'bench{i}@example.com') for i in range(20)
+            )
+            Issue.objects.bulk_create(
+                Issue(
+                    title=f'Benchmark issue {i}', description='Lorem ipsum dolor sit amet ' * 4,
+                    owner=users[i % len(users)], assigned_to=users[(i * 7) % len(users)] if i % 3 else None,
+                )
+                for i in range(rows)
+            )
+            queryset = Issue.objects.filter(owner__in=users).order_by('-created_at', '-id')
+
+            # Rows are loaded before timing: only the rendering (Python) cost is compared
+            instances = list(queryset.select_related('owner', 'assigned_to')[:rows])
+            values_rows = list(project_issues(queryset, fields)[:rows])
+
+            serializer_time = self.best_time(repeat, lambda: IssueSerializer(instances, many=True).data)
+            fast_time = self.best_time(repeat, lambda: issue_rows(values_rows, fields))
+            transaction.set_rollback(True) # Leave the database as it was
+
+        self.stdout.write(f'{rows} rows, fields: {",".join(fields)}')
+        self.stdout.write(f'IssueSerializer: {rows / serializer_time:12,.0f} rows/s')
+        self.stdout.write(f'Fast read path:  {rows / fast_time:12,.0f} rows/s')
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {serializer_time / fast_time:.1f}x'))
+
+    def best_time(self, repeat, render):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,85 @@
+# issues/management/commands/import_issues.py
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from issues.importer import DEFAULT_BATCH_SIZE, ImportAlreadyCompleted, import_issues, read_records
+
+PROGRESS_INTERVAL = 2 # Seconds between progress lines
+
+
+class Command(BaseCommand):
+    help = (
+        'Import issues from a CSV or JSONL file (or - for stdin), in batched transactions '
+        '(COPY on PostgreSQL). An interrupted import resumes where it stopped when run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file, - reads stdin.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format, guessed from the file extension by default.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Records per transaction.')
+        parser.add_argument('--import-id', help='Resume key, the absolute path of the file by default (required for stdin).')
+        parser.add_argument('--restart', action='store_true', help='Forget the progress of a previous run and start over.')
+        parser.add_argument('--create-users', action='store_true', help='Create unknown owners/assignees (with unusable passwords) instead of rejecting their issues.')
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create() even where COPY is available.')
+        parser.add_argument('--rejects', help='Write rejected records (record number and error) to this JSONL file.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        if path == '-':
+            if not options['import_id']:
+                raise CommandError('--import-id is required when reading stdin.')
+            stream = sys.stdin
+        else:
+            stream = open(path, newline='', encoding='utf-8')
+        source = options['import_id'] or os.path.abspath(path)
+
+        rejects = open(options['rejects'], 'a', encoding='utf-8') if options['rejects'] else None
+        started = last_report = time.monotonic()
+        records_read = 0
+
+        def on_reject(record_number, error):
+            if rejects:
+                rejects.write(json.dumps({'record': record_number, 'error': str(error)}) + '\n')
+            elif options['verbosity'] > 1:
+                self.stderr.write(f'Record {record_number}: {error}')
+
+        def on_batch(progress, read):
+            nonlocal last_report, records_read
+            records_read = read
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                self.report(progress, records_read / (now - started))
+
+        try:
+            progress = import_issues(
+                read_records(stream, input_format), source,
+                batch_size=options['batch_size'],
+                copy=False if options['no_copy'] else None,
+                create_users=options['create_users'],
+                restart=options['restart'],
+                on_batch=on_batch, on_reject=on_reject,
+            )
+        except ImportAlreadyCompleted:
+            raise CommandError(f'{source} was already imported, use --restart to import it again.')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if rejects:
+                rejects.close()
+
+        self.report(progress, records_read / (time.monotonic() - started))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {progress.issues_created} issues, rejected {progress.records_rejected} records.'
+        ))
+
+    def report(self, progress, rate):
+        self.stdout.write(
+            f'{progress.records_done} records, {progress.issues_created} imported, '
+            f'{progress.records_rejected} rejected, {rate:,.0f} records/s'
+        )
@@ -0,0 +1,15 @@
+# issues/management/commands/prune_tombstones.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from issues.models import IssueTombstone
+from issues.sync import TOMBSTONE_RETENTION
+
+
+class Command(BaseCommand):
+    help = 'Delete delta sync tombstones older than the retention period (clients with older tokens must reload).'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - TOMBSTONE_RETENTION
+        deleted, _ = IssueTombstone.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones older than {cutoff:%Y-%m-%d %H:%M}.'))
@@ -0,0 +1,31 @@
+# issues/management/commands/reconcile_issue_counters.py
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+
+from issues.counters import TOTALS, reconcile_counters
+from issues.models import IssueCounter
+
+
+class Command(BaseCommand):
+    help = 'Recount the per-user issue counters from the issues table, report the drift and fix it (see issues/counters.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the drift.')
+
+    def handle(self, *args, **options):
+        using = router.db_for_write(IssueCounter)
+        with transaction.atomic(using=using):
+            # Lock the counter rows: a write either committed before (and is counted) or waits for us
+            # to apply its delta afterwards (its issue isn't committed, so it isn't counted)
+            list(IssueCounter.objects.using(using).select_for_update().values_list('pk'))
+            drift = reconcile_counters(fix=not options['dry_run'])
+
+        for (key, status), (stored, actual) in sorted(drift.items(), key=lambda item: (item[0][0] is not TOTALS, item[0])):
+            who = 'totals' if key is TOTALS else f'user {key}'
+            self.stdout.write(f'{who} {status}: stored {stored}, actual {actual}')
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Counters are up to date.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} counters drifted, run without --dry-run to fix them.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(drift)} counters.'))
@@ -0,0 +1,48 @@
+# issues/management/commands/seed_issues.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from issues.importer import DEFAULT_BATCH_SIZE
+from issues.seeding import SEED_PASSWORD, SEED_USER_PREFIX, clear_seed_data, seed_dataset
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Create a deterministic benchmark dataset: seed-user-NNNNN users, seed-admin-N admins '
+        f'(password "{SEED_PASSWORD}") and issues with realistic owner/assignee/status distributions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--issues', type=int, default=100000)
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=1, help='Same seed and sizes, same data.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--clear', action='store_true', help='Delete a previously seeded dataset first.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('--users must be at least 1.')
+        if options['clear']:
+            deleted = clear_seed_data()
+            self.stdout.write(f'Deleted the previous dataset ({deleted} issues).')
+        elif User.objects.filter(username__startswith=SEED_USER_PREFIX).exists():
+            raise CommandError('A seeded dataset already exists, use --clear to replace it.')
+
+        started = time.monotonic()
+
+        def on_batch(progress, records_read):
+            self.stdout.write(f'{progress.issues_created} / {options["issues"]} issues')
+
+        created = seed_dataset(
+            options['users'], options['issues'], admins=options['admins'], seed=options['seed'],
+            batch_size=options['batch_size'], on_batch=on_batch if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {options["users"]} users, {options["admins"]} admins and {created} issues '
+            f'in {time.monotonic() - started:.1f}s.'
+        ))
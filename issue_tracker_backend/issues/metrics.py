@@ -0,0 +1,237 @@
+# issues/metrics.py
+"""
+Per-request performance instrumentation.
+
+RequestMetricsMiddleware records for every request:
+- the number of queries and the time spent in the database, via a query timer installed
+  as an execute_wrapper on every database connection;
+- the serialization time: rendering the DRF response to JSON, plus the response data built
+  before it with serialization() (the fast-path rows of issues/projection.py);
+- the total time.
+
+The numbers go out as a Server-Timing header (shown in the browser's network panel) and as a
+JSON log line on the 'issues.metrics' logger: INFO for every request, WARNING for requests and
+queries slower than settings.SLOW_REQUEST_THRESHOLD_MS / SLOW_QUERY_THRESHOLD_MS, with the SQL
+and the view name (e.g. IssueViewSet.my_issues). Per-view percentiles of the latest requests
+are kept per process and served to admins at /api/issues/request_stats/.
+
+Streaming responses (the event stream, exports) are measured until the response starts.
+"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('issues.metrics')
+
+SAMPLE_SIZE = 1000 # Latest requests per view used for the percentiles
+UNRESOLVED_VIEW = '<unresolved>' # 404s and requests answered before URL resolution
+
+# Metrics of the request being handled. Context variables follow the request into
+# sync_to_async threads, so queries of async views are counted too.
+_current = ContextVar('issues_request_metrics', default=None)
+
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_SIZE))
+_counts = defaultdict(int)
+_samples_lock = threading.Lock()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.slowest_query = None # (duration, sql)
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        if self.slowest_query is None or duration > self.slowest_query[0]:
+            self.slowest_query = (duration, sql)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+    Database execute_wrapper: times each query of an instrumented request.
+    """
+    metrics = _current.get()
+    if metrics is None: # Management commands, migrations, ...
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        metrics.add_query(sql, duration)
+        if duration * 1000 >= getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100):
+            logger.warning(json.dumps({
+                'event': 'slow_query',
+                'view': metrics.view or UNRESOLVED_VIEW,
+                'duration_ms': _ms(duration),
+                'sql': sql,
+            }))
+
+
+@contextmanager
+def serialization():
+    """
+    Count the time spent in the block as serialization of the current request (if any).
+    """
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.render_time += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # connection_created receiver (see IssuesConfig.ready): every connection, in every thread, is timed
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def view_name(view_func, request):
+    """
+    Readable name of the view handling `request`: IssueViewSet.my_issues, TokenObtainPairView.post, issue_events.
+    """
+    method = request.method.lower()
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', UNRESOLVED_VIEW)
+    actions = getattr(view_func, 'actions', None) or {} # DRF viewsets map methods to actions
+    return f'{view_class.__name__}.{actions.get(method, method)}'
+
+
+def record_request(view, total, metrics):
+    with _samples_lock:
+        _counts[view] += 1
+        _samples[view].append((total, metrics.db_time, metrics.queries))
+
+
+def percentile(ordered, percent):
+    # Nearest-rank percentile of an ascending list
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def request_stats():
+    """
+    Per-view aggregates of the latest SAMPLE_SIZE requests of this process, slowest p95 first.
+    """
+    with _samples_lock:
+        snapshot = {view: (_counts[view], list(samples)) for view, samples in _samples.items()}
+    stats = {}
+    for view, (count, samples) in snapshot.items():
+        totals = sorted(total for total, _, _ in samples)
+        stats[view] = {
+            'count': count,
+            'p50_ms': _ms(percentile(totals, 50)),
+            'p95_ms': _ms(percentile(totals, 95)),
+            'p99_ms': _ms(percentile(totals, 99)),
+            'max_ms': _ms(totals[-1]),
+            'avg_db_ms': _ms(sum(db_time for _, db_time, _ in samples) / len(samples)),
+            'avg_queries': round(sum(queries for _, _, queries in samples) / len(samples), 2),
+        }
+    return dict(sorted(stats.items(), key=lambda item: item[1]['p95_ms'], reverse=True))
+
+
+def reset_request_stats():
+    with _samples_lock:
+        _samples.clear()
+        _counts.clear()
+
+
+class RequestMetricsMiddleware:
+    """
+    Put it first in settings.MIDDLEWARE so the total covers the other middleware too.
+    Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.view = view_name(view_func, request)
+
+    def process_template_response(self, request, response):
+        # Called right before DRF renders the response, the post-render callback right after
+        metrics = _current.get()
+        if metrics is not None:
+            render_started = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_time += time.perf_counter() - render_started
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        view = metrics.view or UNRESOLVED_VIEW
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={_ms(metrics.db_time)};desc="{metrics.queries} queries"',
+            f'serialize;dur={_ms(metrics.render_time)}',
+            f'total;dur={_ms(total)}',
+        ])
+        record_request(view, total, metrics)
+
+        line = {
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'db_ms': _ms(metrics.db_time),
+            'queries': metrics.queries,
+            'serialize_ms': _ms(metrics.render_time),
+        }
+        if total * 1000 >= getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500):
+            line['event'] = 'slow_request'
+            if metrics.slowest_query is not None:
+                line['slowest_query_ms'] = _ms(metrics.slowest_query[0])
+                line['slowest_query_sql'] = metrics.slowest_query[1]
+            logger.warning(json.dumps(line))
+        else:
+            logger.info(json.dumps(line))
+        return response
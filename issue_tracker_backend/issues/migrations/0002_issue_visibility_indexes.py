@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+from issues.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+
+    atomic = False # CREATE INDEX CONCURRENTLY can't run in a transaction, see issues/operations.py
+
+    dependencies = [
+        ('issues', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='issue',
+            index=models.Index(fields=['owner', 'status', '-created_at'], name='issue_owner_status_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='issue',
+            index=models.Index(fields=['assigned_to', 'status', '-created_at'], name='issue_assignee_status_idx'),
+        ),
+    ]
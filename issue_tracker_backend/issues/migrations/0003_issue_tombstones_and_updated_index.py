@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from issues.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+
+    atomic = False # CREATE INDEX CONCURRENTLY can't run in a transaction, see issues/operations.py
+
+    dependencies = [
+        ('issues', '0002_issue_visibility_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='issue',
+            index=models.Index(fields=['updated_at', 'id'], name='issue_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='issuetombstone',
+            name='user',
+            field=models.ForeignKey(blank=True, help_text='The user who lost access to the issue, empty if the issue was deleted.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='issue_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='issuetombstone',
+            index=models.Index(fields=['user', 'created_at'], name='tombstone_user_created_idx'),
+        ),
+    ]
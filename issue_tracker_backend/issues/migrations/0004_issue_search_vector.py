@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:49
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Keeps issues_issue.search_vector in sync with title/description. Django never writes the
+# column (the manager defers it), so the trigger is its only writer.
+CREATE_SEARCH_TRIGGER = """
+CREATE FUNCTION issues_issue_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER issues_issue_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON issues_issue
+    FOR EACH ROW EXECUTE FUNCTION issues_issue_search_vector_update();
+"""
+
+# Existing rows, a committed batch of ids at a time (the migration isn't atomic): one UPDATE of
+# the whole table would lock every issue against writes until it finished. Rows written since
+# the trigger was created already have their vector.
+BACKFILL_BATCH_SIZE = 10000
+BACKFILL_SEARCH_VECTOR = """
+UPDATE issues_issue SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+WHERE id > %s AND id <= %s AND search_vector IS NULL
+"""
+
+CREATE_SEARCH_INDEX = 'CREATE INDEX CONCURRENTLY IF NOT EXISTS issue_search_vector_gin ON issues_issue USING gin (search_vector)'
+
+DROP_SEARCH_TRIGGER = """
+DROP TRIGGER IF EXISTS issues_issue_search_vector_trigger ON issues_issue;
+DROP FUNCTION IF EXISTS issues_issue_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql': # Other databases use the icontains fallback
+        return
+    schema_editor.execute(CREATE_SEARCH_TRIGGER, params=None) # params=None: run as one multi-statement script
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT coalesce(max(id), 0) FROM issues_issue')
+        last_id, = cursor.fetchone()
+        for start in range(0, last_id, BACKFILL_BATCH_SIZE):
+            cursor.execute(BACKFILL_SEARCH_VECTOR, [start, start + BACKFILL_BATCH_SIZE])
+    schema_editor.execute(CREATE_SEARCH_INDEX) # Writes go on while it builds
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS issue_search_vector_gin')
+        schema_editor.execute(DROP_SEARCH_TRIGGER, params=None)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False # Backfill batches commit one by one; CREATE INDEX CONCURRENTLY can't run in a transaction
+
+    dependencies = [
+        ('issues', '0003_issue_tombstones_and_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
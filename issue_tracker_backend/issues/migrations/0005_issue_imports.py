@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0004_issue_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Import id, the absolute path of the file by default.', max_length=255, unique=True)),
+                ('records_done', models.BigIntegerField(default=0)),
+                ('issues_created', models.BigIntegerField(default=0)),
+                ('records_rejected', models.BigIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
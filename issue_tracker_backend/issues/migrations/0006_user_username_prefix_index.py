@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations
+
+# Expression index for the user directory's prefix ranges and keyset order (issues/directory.py).
+# auth's User model can't declare it in its Meta, so it is created here.
+INDEX_NAME = 'user_username_prefix_idx'
+CREATE_INDEX = {
+    'postgresql': 'CREATE INDEX CONCURRENTLY {name} ON {table} ((LOWER(username) COLLATE "C"), id)', # Signups go on while it builds
+    'sqlite': 'CREATE INDEX {name} ON {table} (LOWER(username), id)', # BINARY, already code point order
+}
+
+
+def create_prefix_index(apps, schema_editor):
+    sql = CREATE_INDEX.get(schema_editor.connection.vendor)
+    if sql: # Other databases fall back to scanning the username index
+        table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+        schema_editor.execute(sql.format(name=INDEX_NAME, table=schema_editor.quote_name(table)))
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_INDEX:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False # CREATE INDEX CONCURRENTLY can't run in a transaction
+
+    dependencies = [
+        ('issues', '0005_issue_imports'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
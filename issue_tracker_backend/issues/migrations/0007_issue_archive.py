@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:26
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Hot issues and archived issues as one relation, for IssueWithArchive. A view over UNION ALL
+# keeps each table's indexes usable: filters are pushed down into both branches.
+COLUMNS = 'id, title, description, status, owner_id, assigned_to_id, created_at, updated_at, search_vector'
+CREATE_VIEW = f"""
+CREATE VIEW issues_issue_with_archive AS
+    SELECT {COLUMNS} FROM issues_issue
+    UNION ALL
+    SELECT {COLUMNS} FROM issues_archivedissue
+"""
+# Full-text search over archived issues (?q= with ?include_archived=1), see migration 0004
+CREATE_ARCHIVE_SEARCH_INDEX = 'CREATE INDEX archived_search_vector_gin ON issues_archivedissue USING gin (search_vector)'
+
+
+def create_view(apps, schema_editor):
+    schema_editor.execute(CREATE_VIEW)
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_ARCHIVE_SEARCH_INDEX)
+
+
+def drop_view(apps, schema_editor):
+    schema_editor.execute('DROP VIEW IF EXISTS issues_issue_with_archive')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0006_user_username_prefix_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueWithArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('IN_PROGRESS', 'In Progress'), ('CLOSED', 'Closed')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+            ],
+            options={
+                'db_table': 'issues_issue_with_archive',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedIssue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('IN_PROGRESS', 'In Progress'), ('CLOSED', 'Closed')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['owner', 'status', '-created_at'], name='archived_owner_status_idx'), models.Index(fields=['assigned_to', 'status', '-created_at'], name='archived_assignee_status_idx')],
+            },
+        ),
+        migrations.RunPython(create_view, drop_view),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+
+FIELDS = {'OPEN': 'open_count', 'IN_PROGRESS': 'in_progress_count', 'CLOSED': 'closed_count'}
+
+
+def fill_counters(apps, schema_editor):
+    # Initial counts, same rules as issues/counters.py: owner, assignee if someone else, totals (user NULL)
+    Issue = apps.get_model('issues', 'Issue')
+    IssueCounter = apps.get_model('issues', 'IssueCounter')
+    issues = Issue.objects.order_by()
+    counters = {}
+
+    def add(user_id, status, count):
+        if status in FIELDS:
+            row = counters.setdefault(user_id, IssueCounter(user_id=user_id))
+            setattr(row, FIELDS[status], getattr(row, FIELDS[status]) + count)
+
+    for owner_id, status, count in issues.values_list('owner_id', 'status').annotate(Count('id')):
+        add(owner_id, status, count)
+    assigned = issues.filter(assigned_to__isnull=False).exclude(assigned_to=F('owner'))
+    for assignee_id, status, count in assigned.values_list('assigned_to_id', 'status').annotate(Count('id')):
+        add(assignee_id, status, count)
+    counters[None] = IssueCounter(user_id=None) # The totals row always exists
+    for status, count in issues.values_list('status').annotate(Count('id')):
+        add(None, status, count)
+    IssueCounter.objects.bulk_create(counters.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0007_issue_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('open_count', models.BigIntegerField(default=0)),
+                ('in_progress_count', models.BigIntegerField(default=0)),
+                ('closed_count', models.BigIntegerField(default=0)),
+                ('user', models.OneToOneField(blank=True, help_text='Empty for the totals over all issues.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='issue_counter', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+from issues.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+
+    atomic = False # CREATE INDEX CONCURRENTLY can't run in a transaction, see issues/operations.py
+
+    dependencies = [
+        ('issues', '0008_issue_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='issue',
+            index=models.Index(fields=['-created_at', '-id'], name='issue_created_idx'),
+        ),
+    ]
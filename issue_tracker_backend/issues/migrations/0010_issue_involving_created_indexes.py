@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+from issues.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+
+    atomic = False # CREATE INDEX CONCURRENTLY can't run in a transaction, see issues/operations.py
+
+    dependencies = [
+        ('issues', '0009_issue_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='issue',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='issue_owner_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='issue',
+            index=models.Index(fields=['assigned_to', '-created_at', '-id'], name='issue_assignee_created_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+FIELDS = ('open_count', 'in_progress_count', 'closed_count')
+TOTALS_SHARDS = 16 # IssueCounter.TOTALS_SHARDS when this migration was written
+
+
+def shard_totals(apps, schema_editor):
+    # Merge the totals rows (there may be several, from concurrent first writes) into shard 0,
+    # then create the other shards
+    IssueCounter = apps.get_model('issues', 'IssueCounter')
+    totals = list(IssueCounter.objects.filter(user__isnull=True).order_by('pk'))
+    first = totals[0] if totals else IssueCounter(user_id=None)
+    for row in totals[1:]:
+        for field in FIELDS:
+            setattr(first, field, getattr(first, field) + getattr(row, field))
+    first.shard = 0
+    first.save()
+    IssueCounter.objects.filter(pk__in=[row.pk for row in totals[1:]]).delete()
+    IssueCounter.objects.bulk_create(IssueCounter(user_id=None, shard=shard) for shard in range(1, TOTALS_SHARDS))
+
+
+def unshard_totals(apps, schema_editor):
+    IssueCounter = apps.get_model('issues', 'IssueCounter')
+    totals = list(IssueCounter.objects.filter(user__isnull=True).order_by('shard'))
+    if totals:
+        for field in FIELDS:
+            setattr(totals[0], field, sum(getattr(row, field) for row in totals))
+        totals[0].save()
+        IssueCounter.objects.filter(pk__in=[row.pk for row in totals[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0010_issue_involving_created_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issuecounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Totals rows only, 0 for users.'),
+        ),
+        migrations.RunPython(shard_totals, unshard_totals),
+        migrations.AddConstraint(
+            model_name='issuecounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('shard',), name='issue_counter_totals_shard_unique'),
+        ),
+    ]
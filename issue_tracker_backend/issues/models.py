@@ -1,9 +1,160 @@
 # issues/models.py
-from django.db import models
+from django.db import models, connections, router, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
 from django.contrib.auth import get_user_model # Best practice to get the active user model
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
 
 User = get_user_model() # This will get Django's default User model
 
+SEARCH_CONFIG = 'english' # Postgres text search configuration, must match the trigger in migration 0004
+
+
+class IssueQuerySet(models.QuerySet):
+    """
+    Visibility queries shared by the API endpoints.
+
+    The "owner OR assignee" rule is written as a UNION ALL of two branches so each
+    branch can use its own (user, status, created_at) index. An OR over two columns
+    (plus DISTINCT) forces Postgres into a scan of the whole table.
+
+    Pages are pushed into the branches by page(), which the cursor paginator calls: each branch
+    is ordered and limited to the end of the page on its own index, and only those few ids are
+    merged, ordered and limited again. A page costs the same however many issues the user has.
+    For that the queryset keeps the queryset before the visibility filter (`_visibility`) and
+    repeats on it the filter(), exclude(), annotate(), order_by() and values() calls made
+    afterwards; any other call drops it, and page() is then a plain slice. get() pushes its
+    lookup into the branches the same way. _visible_rows() is the one place the union is built.
+    """
+    _visibility = None # (branch queryset, page queryset, branch filters), see _visible_rows()
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._visibility = None # Kept by the methods below only
+        return clone
+
+    def _keep_visibility(self, clone, method, *args, **kwargs):
+        if self._visibility is not None:
+            base, rows, branches = self._visibility
+            clone._visibility = (getattr(base, method)(*args, **kwargs), getattr(rows, method)(*args, **kwargs), branches)
+        return clone
+
+    def filter(self, *args, **kwargs):
+        return self._keep_visibility(super().filter(*args, **kwargs), 'filter', *args, **kwargs)
+
+    def exclude(self, *args, **kwargs):
+        return self._keep_visibility(super().exclude(*args, **kwargs), 'exclude', *args, **kwargs)
+
+    def annotate(self, *args, **kwargs):
+        return self._keep_visibility(super().annotate(*args, **kwargs), 'annotate', *args, **kwargs)
+
+    def order_by(self, *field_names):
+        return self._keep_visibility(super().order_by(*field_names), 'order_by', *field_names)
+
+    def values(self, *fields, **expressions):
+        clone = super().values(*fields, **expressions)
+        if self._visibility is None:
+            return clone
+        # The branches only select pk: they keep the expressions (which may be filtered or ordered
+        # on) but not the columns, whose joins would run in every branch
+        base, rows, branches = self._visibility
+        clone._visibility = (base.annotate(**expressions), rows.values(*fields, **expressions), branches)
+        return clone
+
+    @staticmethod
+    def _visible_rows(visibility, stop=None):
+        """
+        The rows of `rows` in any of the branches, with everything applied to `base` repeated
+        inside each branch, each branch cut to its first `stop` rows when given. Plain queryset,
+        no `_visibility`.
+        """
+        base, rows, branches = visibility
+        if stop is None:
+            parts = [base.filter(branch).order_by().values('pk') for branch in branches]
+        else:
+            # The first `stop` rows of each branch, in page order, hold every row of the page
+            parts = [base.filter(branch).values('pk')[:stop] for branch in branches]
+            if not connections[base.db].features.supports_slicing_ordering_in_compound:
+                # SQLite: no LIMIT in the parts of a UNION, wrap each part in a subquery
+                parts = [base.model._base_manager.using(base.db).filter(pk__in=part).order_by().values('pk') for part in parts]
+        # UNION ALL: the branches never overlap (see involving()), so no DISTINCT is needed
+        return rows.filter(pk__in=parts[0].union(*parts[1:], all=True))
+
+    def page(self, start, stop):
+        """
+        The rows [start:stop] of this (ordered) queryset, pushed into the involving() branches
+        when it still has them.
+        """
+        if self._visibility is None or self._result_cache is not None or not self.ordered:
+            return self[start:stop]
+        return self._visible_rows(self._visibility, stop)[start:stop]
+
+    def get(self, *args, **kwargs):
+        # Single issue reads: the lookup (usually pk) runs in each branch instead of after the union
+        if self._visibility is None or self.query.is_sliced:
+            return super().get(*args, **kwargs)
+        return self._visible_rows(self.filter(*args, **kwargs)._visibility).get()
+
+    async def aget(self, *args, **kwargs):
+        if self._visibility is None or self.query.is_sliced:
+            return await super().aget(*args, **kwargs)
+        return await self._visible_rows(self.filter(*args, **kwargs)._visibility).aget()
+
+    def involving(self, user, status=None):
+        """
+        Issues owned by or assigned to `user`, optionally restricted to one status.
+        `status` must already be normalized (see Issue.normalize_status).
+        """
+        queryset = self if status is None else self.filter(status=status)
+        # Skip assigned rows the user also owns, so UNION ALL never returns duplicates and no DISTINCT is needed
+        visibility = (queryset, queryset, (Q(owner=user), Q(assigned_to=user) & ~Q(owner=user)))
+        involving = self._visible_rows(visibility)
+        involving._visibility = visibility
+        return involving
+
+    def visible_to(self, user, status=None):
+        """
+        Issues `user` may see: everything for admins (is_staff), otherwise only
+        the issues they own or are assigned to.
+        """
+        if user.is_staff:
+            return self if status is None else self.filter(status=status)
+        return self.involving(user, status=status)
+
+    def matching(self, terms):
+        """
+        Issues matching `terms` in title or description, without a rank (see search()).
+        """
+        if connections[self.db].vendor == 'postgresql':
+            return self.filter(search_vector=SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG))
+        return self.filter(Q(title__icontains=terms) | Q(description__icontains=terms))
+
+    def search(self, terms):
+        """
+        Issues matching `terms` in title or description, annotated with a relevance `rank`
+        (higher is better; title matches weigh more than description matches).
+
+        On PostgreSQL this uses the trigger-maintained `search_vector` column and its GIN index,
+        with web-search syntax ("login -mobile", "\"exact phrase\""). Other databases (the
+        SQLite test setup) fall back to a substring match.
+        """
+        if connections[self.db].vendor == 'postgresql':
+            query = SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG)
+            # ts_rank returns a float4; cast it so the value survives the cursor round trip exactly
+            rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+        else:
+            rank = Case(When(title__icontains=terms, then=Value(2.0)), default=Value(1.0), output_field=FloatField())
+        return self.matching(terms).annotate(rank=rank)
+
+
+class IssueManager(models.Manager.from_queryset(IssueQuerySet)):
+    def get_queryset(self):
+        # The search vector is only used inside queries; never load it, and never write it
+        # back on save() either (deferred fields are left out of the UPDATE), so the database
+        # trigger stays the only writer.
+        return super().get_queryset().defer('search_vector')
+
+
 class Issue(models.Model):
     STATUS_CHOICES = [
         ('OPEN', 'Open'),
@@ -34,9 +185,194 @@ class Issue(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted tsvector of title (A) and description (B), maintained by a database trigger on
+    # PostgreSQL (see migration 0004) and indexed with GIN. Unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = IssueManager()
 
     class Meta:
         ordering = ['-created_at'] # Order by newest first
+        indexes = [
+            # One index per branch of IssueQuerySet.involving(), matching its filter + ordering,
+            # so a page reads only its own rows: with a status filter ...
+            models.Index(fields=['owner', 'status', '-created_at'], name='issue_owner_status_idx'),
+            models.Index(fields=['assigned_to', 'status', '-created_at'], name='issue_assignee_status_idx'),
+            # ... and without one
+            models.Index(fields=['owner', '-created_at', '-id'], name='issue_owner_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at', '-id'], name='issue_assignee_created_idx'),
+            # Delta sync feed (/api/issues/changes/) walks issues in (updated_at, id) order
+            models.Index(fields=['updated_at', 'id'], name='issue_updated_idx'),
+            # Unfiltered newest-first pages: staff listings and the admin changelist (-created_at, -pk)
+            models.Index(fields=['-created_at', '-id'], name='issue_created_idx'),
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+    def save(self, *args, **kwargs):
+        # The post_save receiver updates the per-user counters (issues/counters.py) in the same
+        # transaction as the row. savepoint=False: no extra queries inside an outer transaction.
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(Issue, instance=self), savepoint=False):
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the loaded values so signal receivers can tell who the previous assignee was
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @staticmethod
+    def normalize_status(value):
+        """
+        Normalize a user-supplied status ("open", " Open ") to the stored form ("OPEN"),
+        so lookups can use an exact match instead of `iexact`. Returns None for empty input.
+        """
+        if value is None:
+            return None
+        value = str(value).strip().upper()
+        return value or None
+
+
+class IssueTombstone(models.Model):
+    """
+    Records that an issue disappeared for a user, so the delta sync feed can tell clients to drop it.
+
+    - user is NULL: the issue was deleted (reported to admins, who see every issue).
+    - user is set: the issue was deleted or became invisible to that user (e.g. they were unassigned).
+    """
+    issue_id = models.BigIntegerField() # Plain id, the issue row itself may be gone
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='issue_tombstones',
+        blank=True,
+        null=True,
+        help_text='The user who lost access to the issue, empty if the issue was deleted.'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='tombstone_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'Issue #{self.issue_id} removed'
+
+
+class IssueImport(models.Model):
+    """
+    Progress of a `manage.py import_issues` run. It is updated in the same transaction as each
+    imported batch, so an interrupted import resumes right after its last committed batch.
+    """
+    source = models.CharField(max_length=255, unique=True, help_text='Import id, the absolute path of the file by default.')
+    records_done = models.BigIntegerField(default=0) # Input records consumed, imported or rejected
+    issues_created = models.BigIntegerField(default=0)
+    records_rejected = models.BigIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return self.source
+
+
+class ArchivedIssue(models.Model):
+    """
+    A CLOSED issue moved out of the issues table by `manage.py archive_issues` (see issues/archive.py).
+    Same columns and id as the issue it was; it moves back (restore_issue) when it is changed again.
+    """
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, related_name='+', blank=True, null=True)
+    created_at = models.DateTimeField() # Copied from the issue, not stamped
+    updated_at = models.DateTimeField()
+    search_vector = SearchVectorField(null=True, editable=False) # Copied, archived issues don't change
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = IssueManager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Same visibility indexes as Issue, used through IssueWithArchive
+            models.Index(fields=['owner', 'status', '-created_at'], name='archived_owner_status_idx'),
+            models.Index(fields=['assigned_to', 'status', '-created_at'], name='archived_assignee_status_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class IssueWithArchive(models.Model):
+    """
+    Read-only view of issues_issue UNION ALL issues_archivedissue (migration 0007), used when a
+    listing asks for ?include_archived=1 and for single-issue reads. It has Issue's columns and
+    manager, so the visibility, search and pagination queries run on it unchanged.
+    """
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES)
+    owner = models.ForeignKey(User, on_delete=models.DO_NOTHING, related_name='+')
+    assigned_to = models.ForeignKey(User, on_delete=models.DO_NOTHING, related_name='+', blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = IssueManager()
+
+    class Meta:
+        managed = False
+        db_table = 'issues_issue_with_archive'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.title
+
+
+class IssueCounter(models.Model):
+    """
+    Issues by status visible to a user (owned or assigned, each issue once), for dashboard headers
+    without counting over the issues table. The rows with an empty user hold the totals, which
+    admins see, split over TOTALS_SHARDS rows (one per shard) so that concurrent writes don't all
+    queue on one row. Hot issues only, like the default listings. Maintained by issues/counters.py.
+    """
+    TOTALS_SHARDS = 16
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='issue_counter',
+        blank=True,
+        null=True,
+        help_text='Empty for the totals over all issues.'
+    )
+    open_count = models.BigIntegerField(default=0)
+    in_progress_count = models.BigIntegerField(default=0)
+    closed_count = models.BigIntegerField(default=0)
+    shard = models.PositiveSmallIntegerField(default=0, help_text='Totals rows only, 0 for users.')
+
+    class Meta:
+        constraints = [
+            # NULLs aren't unique: without it concurrent first writes could create a shard twice
+            models.UniqueConstraint(fields=['shard'], condition=Q(user__isnull=True), name='issue_counter_totals_shard_unique'),
+        ]
+
+    def __str__(self):
+        return f'Issue counts of {self.user or f"all users (shard {self.shard})"}'
+
+
+def raw_delete(queryset):
+    """
+    Delete the rows of `queryset` with one DELETE: no collector, so no signals and no cascades.
+    Only for models no other row points to (Issue, ArchivedIssue), otherwise delete() is needed
+    to cascade; checked here so that a relation added later can't leave dangling rows.
+    Returns the number of deleted rows.
+    """
+    opts = queryset.model._meta
+    if opts.related_objects or opts.many_to_many:
+        raise ValueError(f'{opts.label} has relations, delete() must collect them.')
+    return queryset._raw_delete(queryset.db)
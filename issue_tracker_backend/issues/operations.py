@@ -0,0 +1,29 @@
+# issues/operations.py
+"""
+Migration operations for indexes on large, busy tables.
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY: a plain CREATE INDEX blocks
+every write to the table until it is built, which takes minutes on millions of issues. It can't
+run in a transaction, so migrations using these operations set atomic = False. Other databases
+(SQLite in the tests) build the index normally.
+"""
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """
+    AddIndexConcurrently on PostgreSQL, AddIndex elsewhere.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,138 @@
+# issues/pagination.py
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class IssueCursorPagination(CursorPagination):
+    """
+    Keyset pagination for issue listings (/api/issues/ and /api/issues/my_issues/).
+
+    Pages are addressed by an opaque cursor (?cursor=...) that encodes the position in the
+    (created_at, id) ordering, so a page is a `WHERE created_at < ? ... LIMIT n` instead of a
+    COUNT(*) plus a deep OFFSET. Page cost stays the same however far the client scrolls.
+    """
+    ordering = ('-created_at', '-id') # Newest first; id breaks ties between issues created in the same instant
+    page_size_query_param = 'page_size' # e.g. /api/issues/?page_size=50
+    max_page_size = 100 # Cap so clients can't ask for the whole table in one page
+
+    def get_ordering(self, request, queryset, view):
+        # Search results (?q=, see IssueQuerySet.search) are paged by relevance instead of age
+        if 'rank' in queryset.query.annotations:
+            return ('-rank', '-id')
+        return super().get_ordering(request, queryset, view)
+
+    # CursorPagination.paginate_queryset, split around the page query so that the async views
+    # (issues/async_views.py) can run it with the async ORM instead of in a worker thread.
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_query = self.page_query(queryset, request, view)
+        if page_query is None:
+            return None
+        return self.set_page(list(page_query))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_query = self.page_query(queryset, request, view)
+        if page_query is None:
+            return None
+        return self.set_page([row async for row in page_query])
+
+    def page_query(self, queryset, request, view=None):
+        """
+        The (unevaluated) query of the page plus one row, or None if pagination is off.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            order = self.ordering[0]
+            # (cursor reversed) XOR (ordering reversed)
+            lookup = 'lt' if self.cursor.reverse != order.startswith('-') else 'gt'
+            queryset = queryset.filter(**{f"{order.lstrip('-')}__{lookup}": current_position})
+
+        # One extra row tells whether a page follows. IssueQuerySet.page() runs it inside the visibility branches
+        return queryset.page(offset, offset + self.page_size + 1)
+
+    def set_page(self, results):
+        """
+        Set the page and the next/previous positions from the rows of page_query().
+        """
+        offset, reverse, current_position = self.cursor or (0, False, None)
+        self.page = results[:self.page_size]
+
+        has_following_position = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+        )
+
+        if reverse:
+            self.page.reverse() # Fetched in reverse order
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True # Browsable API
+        return self.page
+
+
+class UserDirectoryPagination(CursorPagination):
+    """
+    Keyset pages of the user directory (/api/users/), in lowercased username order (see issues/directory.py).
+    """
+    ordering = ('username_key', 'id') # id orders users whose names differ only in case
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def estimated_count(queryset):
+    """
+    The PostgreSQL planner's row estimate for `queryset` (EXPLAIN, nothing is executed),
+    or None on other databases.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for the admin changelist that doesn't run an exact COUNT(*) over large results:
+    the total comes from the planner's estimate, so page links and "N issues" are approximate.
+    Estimates below EXACT_COUNT_THRESHOLD are counted exactly, which is cheap at that size.
+    """
+    EXACT_COUNT_THRESHOLD = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < self.EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
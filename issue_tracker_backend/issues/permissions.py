@@ -16,4 +16,5 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         # Write permissions are only allowed to the owner of the issue.
         # Check if the requesting user is the owner OR an admin (is_staff)
         # Admins can manage all issues.
-        return obj.owner == request.user or request.user.is_staff
\ No newline at end of file
+        # Compare ids so the owner row never has to be loaded.
+        return obj.owner_id == request.user.id or request.user.is_staff
\ No newline at end of file
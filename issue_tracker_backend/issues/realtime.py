@@ -0,0 +1,182 @@
+# issues/realtime.py
+"""
+Real-time issue change push (Server-Sent Events on /api/issues/events/, served through asgi.py).
+
+Writes publish events to a broker once their transaction commits; every open event stream
+subscribes to the broker and forwards only the events its user may see. The broker class is
+configurable (settings.ISSUE_EVENTS_BROKER); the default InProcessBroker fans out inside the
+server process, so it needs no external service but only reaches clients connected to the
+same process. A Redis (or similar) broker only has to implement BaseBroker.
+
+Events sent to clients:
+- upsert:  {"action": "created" | "updated" | "assigned", "issue": {...IssueSerializer data...}}
+- remove:  {"action": "deleted" | "unassigned", "id": 5}, the issue was deleted or is no longer visible
+- resync:  {}, changes the stream can't describe (bulk operations, a slow client that fell behind);
+           the client should pull /api/issues/changes/.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .renderers import FastJSONRenderer
+
+RESYNC = {'type': 'resync'}
+
+
+class BaseBroker:
+    """
+    Interface between publishers (request threads) and event streams (async consumers).
+    """
+
+    def has_subscribers(self):
+        # Lets publishers skip serializing events nobody will receive. Brokers that can't
+        # know (e.g. cross-process ones) keep the default.
+        return True
+
+    def publish(self, event):
+        raise NotImplementedError
+
+    def subscribe(self):
+        """
+        Return a subscription with `async get(timeout)` (an event, or None on timeout) and `close()`.
+        Must be called from the consumer's event loop.
+        """
+        raise NotImplementedError
+
+
+class InProcessSubscription:
+    def __init__(self, broker, loop, max_queue_size):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Called from any thread; the queue itself is only touched on the subscriber's loop
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True # The client fell behind, it will be told to resync
+
+    async def get(self, timeout):
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return RESYNC
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Fans events out to the event streams of this server process.
+    """
+
+    def __init__(self, max_queue_size=1000):
+        self.max_queue_size = max_queue_size
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def subscribe(self):
+        subscription = InProcessSubscription(self, asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.deliver(event)
+            except RuntimeError: # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_path = getattr(settings, 'ISSUE_EVENTS_BROKER', 'issues.realtime.InProcessBroker')
+                _broker = import_string(broker_path)()
+    return _broker
+
+
+def _publish_on_commit(event):
+    broker = get_broker()
+    transaction.on_commit(lambda: broker.publish(event)) # Runs immediately outside a transaction
+
+
+def publish_issue_event(action, instance, previous_user_ids=()):
+    """
+    Publish a change of one issue. `previous_user_ids` are the users (old owner/assignee) who
+    could see the issue before this change.
+    """
+    broker = get_broker()
+    if not broker.has_subscribers():
+        return
+    from .serializers import IssueSerializer # Local import, serializers import the models this module is used by
+    _publish_on_commit({
+        'action': action,
+        'issue_id': instance.pk,
+        'issue': None if action == 'deleted' else IssueSerializer(instance).data,
+        'user_ids': {instance.owner_id, instance.assigned_to_id} - {None},
+        'previous_user_ids': set(previous_user_ids) - {None},
+    })
+
+
+def publish_bulk_event(user_ids):
+    """
+    Publish a batch change (see issues/bulk.py): the affected users and admins are told to resync.
+    """
+    if get_broker().has_subscribers():
+        _publish_on_commit({'action': 'bulk', 'user_ids': set(user_ids) - {None}})
+
+
+def event_for_user(event, user):
+    """
+    Turn a published event into what `user` may receive: (event type, payload), or None.
+    """
+    if event is RESYNC:
+        return 'resync', {}
+    action = event['action']
+    can_see = user.is_staff or user.pk in event['user_ids']
+
+    if action == 'bulk':
+        return ('resync', {}) if can_see else None
+    if action == 'deleted':
+        return ('remove', {'action': 'deleted', 'id': event['issue_id']}) if can_see else None
+    if can_see:
+        return 'upsert', {'action': action, 'issue': event['issue']}
+    if user.pk in event['previous_user_ids']: # Reassigned away from this user
+        return 'remove', {'action': 'unassigned', 'id': event['issue_id']}
+    return None
+
+
+def format_sse(event_type, payload):
+    # Same JSON encoding as the REST responses
+    return b'event: ' + event_type.encode() + b'\ndata: ' + FastJSONRenderer().render(payload) + b'\n\n'
@@ -0,0 +1,69 @@
+# issues/renderers.py
+"""
+Faster JSON renderer and parser for the API (settings.REST_FRAMEWORK), backed by orjson.
+
+The output is byte for byte what DRF's JSONRenderer produces: compact separators, UTF-8,
+dates and times formatted by DRF's encoder ("...Z" for UTC), U+2028/U+2029 escaped.
+Anything orjson can't do the same way goes through DRF's stdlib implementation instead:
+indented output (the browsable API, "application/json; indent=4"), non-default
+UNICODE_JSON / COMPACT_JSON settings, and data orjson refuses (integers beyond 64 bits,
+types DRF's encoder rejects too, so the same error is raised). Differences left: floats use
+orjson's exponent notation (1e16, not 1e+16) and non-finite floats render as null instead of
+failing; issue responses contain neither.
+
+The parser falls back the same way: bodies orjson rejects, and bodies with numbers that may not
+fit 64 bits (which orjson reads as floats), are parsed by DRF's JSONParser, so the accepted
+input, the values and the error messages are unchanged.
+
+orjson is optional: without it both classes behave exactly like DRF's.
+"""
+import codecs
+import re
+from io import BytesIO
+
+from rest_framework.parsers import JSONParser, get_encoding
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError: # Optional, see the module docstring
+    orjson = None
+
+# Dates and times go to DRF's encoder (JSONEncoder.default) for its formatting;
+# int/bool/None dict keys are written as strings, as the json module does
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+) if orjson else 0
+LONG_NUMBER = re.compile(rb'\d{20}') # Possibly beyond 64 bits; also matches inside strings, which only costs the fast path
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, for output that is a strict JavaScript subset
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        if orjson is None or codecs.lookup(get_encoding(parser_context)).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        # DRF's parser decides: same accepted input (lone surrogates, ...), same values, same errors
+        return super().parse(BytesIO(body), media_type, parser_context)
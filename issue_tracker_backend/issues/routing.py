@@ -0,0 +1,139 @@
+# issues/routing.py
+"""
+Read-replica routing (settings.DATABASE_ROUTERS, replicas listed in settings.DATABASE_REPLICAS).
+
+Everything goes to the primary ('default') unless a view opts in: IssueViewSet sends the safe,
+read-only actions (list, retrieve, my_issues, all_users) to a replica picked at random for the
+request, see use_replica(). The choice lives in a per-request context variable set by
+ReplicaRoutingMiddleware, so it follows the request into sync_to_async threads, and requests
+outside the middleware (management commands, migrations) always use the primary.
+
+Replicas lag behind the primary, so a user's reads stay on the primary for
+settings.REPLICA_PIN_SECONDS (longer than the expected lag) after:
+- any request of theirs that wrote to the database, so they read their own writes;
+- any change to their issues, through invalidate_issue_lists() (issues/cache.py), so a
+  lagging replica never refills their list cache with old rows. Admins see every issue,
+  so any change pins them.
+Pins are kept in the 'replica_pins' cache, which must be shared when running several processes.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_CACHE_ALIAS = 'replica_pins' # See CACHES in settings.py
+ALL_USERS = 'all' # Pinned by every change, used for admins
+
+_current = ContextVar('issues_db_routing', default=None)
+
+
+class RoutingState:
+    def __init__(self):
+        self.replica = None # Alias serving this request's reads, None for the primary
+        self.wrote = False
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _pin_key(scope):
+    return f'issues:pin:{scope}'
+
+
+def pin_to_primary(*scopes):
+    """
+    Keep the reads of the given user ids (or ALL_USERS) on the primary for REPLICA_PIN_SECONDS.
+    """
+    if replicas():
+        timeout = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        caches[PIN_CACHE_ALIAS].set_many({_pin_key(scope): True for scope in scopes}, timeout=timeout)
+
+
+def is_pinned(user):
+    scopes = [user.pk, ALL_USERS] if user.is_staff else [user.pk]
+    return bool(caches[PIN_CACHE_ALIAS].get_many([_pin_key(scope) for scope in scopes]))
+
+
+def use_replica(request):
+    """
+    Serve the rest of this request's reads from a replica, unless the request isn't safe, the user
+    is pinned to the primary or there are no replicas. Returns the alias, or None for the primary.
+    """
+    state = _current.get()
+    if state is None or not replicas() or request.method not in SAFE_METHODS or state.wrote:
+        return None
+    if request.user.is_authenticated and is_pinned(request.user):
+        return None
+    state.replica = random.choice(replicas())
+    return state.replica
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        return state.replica if state is not None and state.replica else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Always the primary, also for instances that were read from a replica
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+            state.replica = None # Read what was just written
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True # Replicas hold the primary's data
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in replicas() else None # Replicas get the schema through replication
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sets up the routing state of each request and pins users who wrote to the primary.
+    Put it after the authentication middleware. Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, state)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        if state.wrote:
+            await sync_to_async(self.finish)(request, state) # request.user may still have to be loaded
+        return response
+
+    def finish(self, request, state):
+        user = getattr(request, 'user', None) # Set by DRF once it authenticated the request
+        if state.wrote and user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
@@ -0,0 +1,111 @@
+# issues/seeding.py
+"""
+Deterministic benchmark dataset (`manage.py seed_issues`, used by `manage.py bench_api`).
+
+The same seed and sizes always produce the same users and issues:
+- Owners and assignees follow a Zipf-like distribution, so a few users own or hold many
+  issues and most users have a handful. seed-user-00001 is the busiest.
+- About 75% of the issues are assigned. Statuses are roughly 45% OPEN, 20% IN_PROGRESS
+  and 35% CLOSED, and older issues are more likely to be closed.
+- created_at rises with the issue number over the year before SEED_EPOCH, and updated_at
+  follows within 30 days.
+
+Issues are written through the importer (issues/importer.py), so PostgreSQL loads them with COPY.
+"""
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import router, transaction
+
+from .cache import invalidate_issue_lists
+from .counters import apply_counter_deltas, queryset_counts
+from .importer import DEFAULT_BATCH_SIZE, import_issues
+from .models import Issue, IssueImport, raw_delete
+
+User = get_user_model()
+
+SEED_USER_PREFIX = 'seed-user-'
+SEED_ADMIN_PREFIX = 'seed-admin-'
+SEED_PASSWORD = 'seed-pass-123' # Every seeded account, used by the login benchmark
+SEED_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc) # Fixed, so timestamps don't depend on the run date
+SEED_SPAN = timedelta(days=365)
+
+STATUS_WEIGHTS = {'OPEN': 45, 'IN_PROGRESS': 20, 'CLOSED': 35}
+ASSIGNED_RATIO = 0.75
+ZIPF_EXPONENT = 1.1
+
+AREAS = ['login', 'dashboard', 'search', 'export', 'billing', 'profile', 'upload', 'notifications', 'sync', 'settings']
+PROBLEMS = ['crashes', 'is slow', 'shows wrong data', 'times out', 'fails on mobile', 'loses changes', 'returns 500', 'looks broken']
+DETAILS = [
+    'Happens every time after a fresh login.', 'Only reproducible with large accounts.',
+    'Started after the last release.', 'Reported by several customers.', 'Steps: open the page, wait a minute, refresh.',
+    'Workaround: reload the page.', 'Console shows a network error.', 'Affects Safari and Firefox.',
+]
+
+
+def seed_usernames(users):
+    return [f'{SEED_USER_PREFIX}{number:05d}' for number in range(1, users + 1)]
+
+
+def clear_seed_data():
+    """
+    Delete the seeded users and everything they own. Returns the number of deleted issues.
+    """
+    seed_users = User.objects.filter(username__startswith=SEED_USER_PREFIX) | User.objects.filter(username__startswith=SEED_ADMIN_PREFIX)
+    seed_issues = Issue.objects.filter(owner__in=seed_users)
+    with transaction.atomic(using=router.db_for_write(Issue)):
+        # Uncount the issues (the seed users' own counter rows are deleted with them)
+        apply_counter_deltas({key: -count for key, count in queryset_counts(seed_issues).items()})
+        # Raw delete of the issues: no per-issue signals (tombstones, events) for throwaway data
+        deleted = raw_delete(seed_issues.using(router.db_for_write(Issue)))
+        seed_users.delete()
+    invalidate_issue_lists()
+    return deleted
+
+
+def _issue_records(rng, usernames, issues):
+    cum_weights = list(accumulate(1 / rank ** ZIPF_EXPONENT for rank in range(1, len(usernames) + 1)))
+    statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    step = SEED_SPAN / max(issues, 1)
+    start = SEED_EPOCH - SEED_SPAN
+
+    for number in range(issues):
+        age = 1 - number / max(issues, 1) # 1 for the oldest issue, close to 0 for the newest
+        owner, assignee = rng.choices(usernames, cum_weights=cum_weights, k=2)
+        weights = [status_weights[0], status_weights[1], status_weights[2] * (0.5 + age)] # Old issues get closed
+        created_at = start + step * number + timedelta(seconds=rng.randrange(60))
+        yield {
+            'title': f'{rng.choice(AREAS).capitalize()} {rng.choice(PROBLEMS)} #{number + 1}',
+            'description': ' '.join(rng.sample(DETAILS, rng.randint(1, 3))),
+            'status': rng.choices(statuses, weights=weights)[0],
+            'owner': owner,
+            'assigned_to': assignee if rng.random() < ASSIGNED_RATIO else None,
+            'created_at': created_at.isoformat(),
+            'updated_at': (created_at + timedelta(seconds=rng.randrange(30 * 86400))).isoformat(),
+        }
+
+
+def seed_dataset(users, issues, admins=2, seed=1, batch_size=DEFAULT_BATCH_SIZE, on_batch=None):
+    """
+    Create `users` regular users, `admins` staff users and `issues` issues, deterministically for a given `seed`.
+    """
+    rng = random.Random(seed)
+    usernames = seed_usernames(users)
+    password = make_password(SEED_PASSWORD) # Hashed once, shared by every seeded account
+    User.objects.bulk_create(
+        [User(username=name, email=f'{name}@example.com', password=password) for name in usernames]
+        + [User(username=f'{SEED_ADMIN_PREFIX}{number}', email=f'{SEED_ADMIN_PREFIX}{number}@example.com',
+                password=password, is_staff=True) for number in range(1, admins + 1)],
+        batch_size=batch_size,
+    )
+
+    source = f'seed-issues-{seed}'
+    progress = import_issues(
+        _issue_records(rng, usernames, issues), source,
+        batch_size=batch_size, restart=True, on_batch=on_batch,
+    )
+    IssueImport.objects.filter(source=source).delete() # Seeding isn't resumable, it starts over with --clear
+    return progress.issues_created
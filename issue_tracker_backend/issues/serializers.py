@@ -26,10 +26,18 @@ class SimpleUserSerializer(DjoserUserSerializer):
         model = User
         fields = ('id', 'username', 'email') # Expose basic user info
 
+class StatusField(serializers.ChoiceField):
+    """
+    Accepts the status in any case ("open", "Open") and stores the normalized value ("OPEN").
+    """
+    def to_internal_value(self, data):
+        return super().to_internal_value(Issue.normalize_status(data))
+
 # Issue Serializer
 class IssueSerializer(serializers.ModelSerializer): #handles reading and writing issues.
     owner = SimpleUserSerializer(read_only=True) # Display owner's details, read-only
     assigned_to = SimpleUserSerializer(read_only=True) # Display assigned_to details, read-only
+    status = StatusField(choices=Issue.STATUS_CHOICES, required=False) # Model default ('OPEN') applies when omitted
     
     # This field is for accepting assigned_to user ID in write operations (create/update)
     assigned_to_id = serializers.PrimaryKeyRelatedField(
@@ -52,4 +60,55 @@ class IssueSerializer(serializers.ModelSerializer): #handles reading and writing
     def update(self, instance, validated_data):
         # If assigned_to_id is provided, update the assigned_to field
         # The 'source' argument in PrimaryKeyRelatedField handles mapping 'assigned_to_id' to 'assigned_to'
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+MAX_BULK_ITEMS = 1000 # Largest batch accepted by the bulk endpoints
+
+# One item of /issues/bulk_create/. assigned_to_id is a plain integer here; the view checks
+# all assignees of the batch with a single query instead of one PrimaryKeyRelatedField lookup per item.
+class BulkIssueItemSerializer(serializers.ModelSerializer):
+    status = StatusField(choices=Issue.STATUS_CHOICES, required=False)
+    assigned_to_id = serializers.IntegerField(allow_null=True, required=False)
+
+    class Meta:
+        model = Issue
+        fields = ['title', 'description', 'status', 'assigned_to_id']
+
+
+class BulkIssueCreateSerializer(serializers.Serializer):
+    issues = BulkIssueItemSerializer(many=True, allow_empty=False, max_length=MAX_BULK_ITEMS)
+
+
+# Selects issues by field values instead of ids in /issues/bulk/
+class BulkIssueFilterSerializer(serializers.Serializer):
+    status = StatusField(choices=Issue.STATUS_CHOICES, required=False)
+    assigned_to_id = serializers.IntegerField(allow_null=True, required=False)
+    owner_id = serializers.IntegerField(required=False)
+
+
+class BulkIssueActionSerializer(serializers.Serializer):
+    '''
+    Body of /issues/bulk/:
+
+    {"action": "set_status", "ids": [1, 2, 3], "status": "CLOSED"}
+    {"action": "assign", "filter": {"status": "OPEN"}, "assigned_to_id": 7}
+    {"action": "delete", "ids": [4, 5]}
+    '''
+    ACTION_CHOICES = ['set_status', 'assign', 'delete']
+
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_BULK_ITEMS)
+    filter = BulkIssueFilterSerializer(required=False)
+    status = StatusField(choices=Issue.STATUS_CHOICES, required=False) # For set_status
+    assigned_to_id = serializers.IntegerField(allow_null=True, required=False) # For assign, null unassigns
+
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError("Provide either 'ids' or 'filter'.")
+        if 'filter' in data and not data['filter']:
+            raise serializers.ValidationError({'filter': 'At least one filter field is required.'})
+        if data['action'] == 'set_status' and 'status' not in data:
+            raise serializers.ValidationError({'status': 'This field is required for set_status.'})
+        if data['action'] == 'assign' and 'assigned_to_id' not in data:
+            raise serializers.ValidationError({'assigned_to_id': 'This field is required for assign (null unassigns).'})
+        return data
@@ -0,0 +1,106 @@
+# issues/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Issue, IssueCounter, IssueTombstone
+from .cache import invalidate_issue_lists
+from .realtime import publish_issue_event
+from .authentication import invalidate_cached_user
+from .counters import apply_counter_deltas, change_deltas
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(sender, instance, created, **kwargs):
+    """
+    Any save (API create/update, assign, admin edits) invalidates the cached lists of
+    the owner and of both the previous and the new assignee, updates their issue counters,
+    records tombstones for users who lost access and pushes the change to connected clients.
+    """
+    loaded = getattr(instance, '_loaded_values', {}) # Values as they were read from the DB, see Issue.from_db
+    invalidate_issue_lists(
+        instance.owner_id,
+        instance.assigned_to_id,
+        loaded.get('owner_id'),
+        loaded.get('assigned_to_id'),
+    )
+
+    # Per-user counters, in the transaction of the save (see Issue.save). An instance that
+    # wasn't loaded with its owner, assignee and status can't be diffed, reconciliation catches it.
+    counted = (instance.owner_id, instance.assigned_to_id, instance.status)
+    if created:
+        apply_counter_deltas(change_deltas(None, counted))
+    elif {'owner_id', 'assigned_to_id', 'status'} <= loaded.keys():
+        apply_counter_deltas(change_deltas((loaded['owner_id'], loaded['assigned_to_id'], loaded['status']), counted))
+
+    # Tell the delta sync feed about users who can no longer see the issue (old owner/assignee)
+    still_visible_to = {instance.owner_id, instance.assigned_to_id}
+    lost_access = {loaded.get('owner_id'), loaded.get('assigned_to_id')} - still_visible_to - {None}
+    if lost_access:
+        IssueTombstone.objects.bulk_create(
+            IssueTombstone(issue_id=instance.pk, user_id=user_id) for user_id in lost_access
+        )
+
+    # Push the change to connected clients (see issues/realtime.py)
+    if created:
+        action = 'created'
+    elif 'assigned_to_id' in loaded and loaded['assigned_to_id'] != instance.assigned_to_id:
+        action = 'assigned'
+    else:
+        action = 'updated'
+    publish_issue_event(action, instance, previous_user_ids=lost_access)
+
+    # The saved values are the new baseline if this instance is saved again
+    loaded.update(owner_id=instance.owner_id, assigned_to_id=instance.assigned_to_id, status=instance.status)
+    instance._loaded_values = loaded
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted(sender, instance, origin=None, **kwargs):
+    invalidate_issue_lists(instance.owner_id, instance.assigned_to_id)
+    deleted_user_ids = _deleted_user_ids(origin)
+
+    # Counters, inside the delete's transaction (the collector runs in one). Rows of users
+    # deleted by the same cascade are already gone and mustn't be recreated.
+    deltas = change_deltas((instance.owner_id, instance.assigned_to_id, instance.status), None)
+    apply_counter_deltas({key: delta for key, delta in deltas.items() if key[0] not in deleted_user_ids})
+
+    # One tombstone for admins (user NULL) plus one for each user who could see the issue,
+    # except users deleted by the same cascade (their tombstones would point at a removed row)
+    user_ids = {None, instance.owner_id, instance.assigned_to_id} - deleted_user_ids
+    IssueTombstone.objects.bulk_create(
+        IssueTombstone(issue_id=instance.pk, user_id=user_id) for user_id in user_ids
+    )
+    publish_issue_event('deleted', instance)
+
+
+def _deleted_user_ids(origin):
+    # `origin` is what delete() was called on: a user, a queryset of users, or something else
+    if isinstance(origin, User):
+        return {origin.pk}
+    if getattr(origin, 'model', None) is User:
+        if not hasattr(origin, '_deleted_user_ids'): # Once per delete(), the rows are still there during the cascade
+            origin._deleted_user_ids = set(origin.values_list('pk', flat=True))
+        return origin._deleted_user_ids
+    return set()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Drop the user from the JWT authentication cache, so deactivation, staff and password
+    changes apply to their next request (within AUTH_USER_CACHE_TTL seconds in other server
+    processes, without a shared cache). Login only updates last_login, which keeps the entry.
+    New users get their (empty) issue counter row, so counter updates never have to create it.
+    """
+    if created and not raw:
+        IssueCounter.objects.create(user=instance)
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        invalidate_cached_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
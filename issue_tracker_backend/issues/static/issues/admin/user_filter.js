@@ -0,0 +1,16 @@
+// Owner / assignee filters of the issue changelist (UserAutocompleteFilter in issues/admin.py):
+// picking a user in the autocomplete box loads the changelist filtered on that user.
+'use strict';
+{
+    const $ = django.jQuery;
+    $(function() {
+        $('.issues-user-filter').on('change', function() {
+            if (!this.value) {
+                return;
+            }
+            const url = new URL(this.dataset.baseUrl, window.location.href);
+            url.searchParams.set(this.dataset.parameter, this.value);
+            window.location.href = url.toString();
+        });
+    });
+}
@@ -0,0 +1,81 @@
+# issues/sync.py
+"""
+Delta sync feed used by /api/issues/changes/.
+
+A sync token encodes a position (updated_at, id) in the issue change stream. A request with
+?since=<token> returns the visible issues changed after that position, the ids of issues the
+user should drop (tombstones) and the token to use next time.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import IssueTombstone
+
+MAX_CHANGES = 500 # Issues per response, clients keep calling while has_more is true
+
+# Rows are stamped with updated_at before their transaction commits, so a change can become
+# visible slightly "in the past". New tokens trail the clock by this much; the overlap means
+# some rows are sent twice, which clients handle by merging on id.
+SAFETY_WINDOW = timedelta(seconds=5)
+
+# Tombstones older than this may be pruned (see the prune_tombstones command), so older tokens
+# can no longer be answered correctly and the client must reload its list.
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+
+class SyncTokenExpired(Exception):
+    pass
+
+
+def encode_token(moment, issue_id=0):
+    micros = int(moment.timestamp() * 1_000_000)
+    return f'{micros}.{issue_id}'
+
+
+def decode_token(token):
+    try:
+        micros, issue_id = token.split('.')
+        moment = datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+        return moment, int(issue_id)
+    except (ValueError, OverflowError, OSError):
+        raise ValidationError({'since': 'Invalid sync token.'})
+
+
+def changes_since(queryset, user, token):
+    """
+    Build the feed for `user`. `queryset` is the base issue queryset of the view
+    (with its select_related); visibility is applied here.
+
+    Returns (issues, removed_ids, next_token, has_more).
+    """
+    now = timezone.now()
+    if not token: # No token yet: nothing to send, just a starting point for the next call
+        return [], [], encode_token(now - SAFETY_WINDOW), False
+
+    since, since_id = decode_token(token)
+    if since < now - TOMBSTONE_RETENTION:
+        raise SyncTokenExpired()
+
+    issues = list(
+        queryset.visible_to(user)
+        .filter(Q(updated_at__gt=since) | Q(updated_at=since, id__gt=since_id))
+        .order_by('updated_at', 'id')[:MAX_CHANGES + 1]
+    )
+    has_more = len(issues) > MAX_CHANGES
+    issues = issues[:MAX_CHANGES]
+
+    # Admins see every issue, so only deletions concern them; other users get their own tombstones
+    tombstones = IssueTombstone.objects.filter(created_at__gt=since)
+    tombstones = tombstones.filter(user__isnull=True) if user.is_staff else tombstones.filter(user=user)
+    changed_ids = {issue.id for issue in issues}
+    # An issue that was removed and has since become visible again (e.g. reassigned back) is kept
+    removed_ids = sorted(set(tombstones.values_list('issue_id', flat=True)) - changed_ids)
+
+    if has_more:
+        next_token = encode_token(issues[-1].updated_at, issues[-1].id)
+    else:
+        next_token = encode_token(max(since, now - SAFETY_WINDOW))
+    return issues, removed_ids, next_token, has_more
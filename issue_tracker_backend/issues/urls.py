@@ -1,11 +1,18 @@
 # issues/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import IssueViewSet
+from .views import IssueViewSet, UserDirectoryView, issue_events
 
 router = DefaultRouter()
-router.register(r'issues', IssueViewSet) # Registers /issues/ and /issues/{id}/
+if settings.ASYNC_ISSUE_VIEWS:
+    from .async_views import AsyncIssueViewSet
+    router.register(r'issues', AsyncIssueViewSet) # Same routes, async read endpoints (served through asgi.py)
+else:
+    router.register(r'issues', IssueViewSet) # Registers /issues/ and /issues/{id}/
 
 urlpatterns = [
+    path('issues/events/', issue_events, name='issue-events'), # Real-time push (SSE), before the router so it isn't read as an issue id
+    path('users/', UserDirectoryView.as_view(), name='user-directory'), # Assignee typeahead
     path('', include(router.urls)), # Includes all routes from IssueViewSet
 ]
\ No newline at end of file
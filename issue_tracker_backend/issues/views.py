@@ -1,20 +1,54 @@
 # issues/views.py
-from rest_framework import viewsets, status
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework import viewsets, generics, status
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, SAFE_METHODS
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q # Q object: Lets you use OR logic in queries
-from .models import Issue
-from .serializers import IssueSerializer, SimpleUserSerializer# Use SimpleUserSerializer for user lists
+from .models import Issue, IssueWithArchive
+from .serializers import IssueSerializer, SimpleUserSerializer, BulkIssueCreateSerializer, BulkIssueActionSerializer, MAX_BULK_ITEMS # Use SimpleUserSerializer for user lists
 from .permissions import IsOwnerOrReadOnly
+from .pagination import IssueCursorPagination, UserDirectoryPagination
+from .cache import cached_list_response, cache_stats
+from .metrics import request_stats
+from .sync import changes_since, SyncTokenExpired
+from .conditional import conditional_response, issue_validators, respond_with_validators
+from .bulk import bulk_create_issues, apply_bulk_action, AssigneeNotFound, TooManyIssues
+from .board import build_board
+from .projection import requested_fields, project_issues, issue_rows, user_table_requested
+from .export import EXPORT_ENCODERS, NDJSONRenderer, CSVRenderer, stream_export
+from .realtime import get_broker, event_for_user, format_sse
+from .authentication import CachedJWTAuthentication
+from .directory import directory_queryset, directory_rows, cached_directory_page
+from .archive import include_archived, restore_issue
+from .counters import counts_for
+from .writes import patch_changes, assign_changes, update_issue
+from .routing import use_replica
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+from rest_framework_simplejwt.exceptions import InvalidToken
 
 User = get_user_model()
 
+ARCHIVE_LISTINGS = {'list', 'my_issues', 'board', 'export'} # Actions that take ?include_archived=1
+REPLICA_ACTIONS = {'list', 'retrieve', 'my_issues', 'all_users'} # Read-only actions served by read replicas
+ASSIGN_DENIED = "You do not have permission to assign this issue."
+
 class IssueViewSet(viewsets.ModelViewSet):
-    queryset = Issue.objects.all()
+    queryset = Issue.objects.select_related('owner', 'assigned_to') # Owner/assignee are nested in every response, so join them up front
+    archive_queryset = IssueWithArchive.objects.select_related('owner', 'assigned_to') # Hot and archived issues, see issues/archive.py
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly] # Apply permissions
+    pagination_class = IssueCursorPagination # Keyset pages on (created_at, id), see issues/pagination.py
+
+    def initial(self, request, *args, **kwargs):
+        # After authentication and permissions (they read from the primary), see issues/routing.py
+        super().initial(request, *args, **kwargs)
+        if self.action in REPLICA_ACTIONS:
+            use_replica(request)
 
     def get_queryset(self):
         """
@@ -22,22 +56,120 @@ class IssueViewSet(viewsets.ModelViewSet):
         - Admins (is_staff) can see all issues.
         - Regular users can only see issues they own or are assigned to.
         - Can filter by 'status' query parameter (e.g., /issues/?status=OPEN).
+        - Can search title/description with the 'q' query parameter (e.g., /issues/?q=login).
+        - Archived issues are left out unless asked for with ?include_archived=1.
+        """
+        queryset = self.base_queryset()
+        status_filter = Issue.normalize_status(self.request.query_params.get('status', None))
+
+        # Admins see all issues, regular users only their owned or assigned issues.
+        # The status is normalized once here so the (user, status, created_at) indexes apply.
+        queryset = queryset.visible_to(self.request.user, status=status_filter)
+        return self.apply_search(queryset)
+
+    def base_queryset(self):
+        """
+        The issues table, or hot and archived issues together (IssueWithArchive) for single-issue
+        reads and for listings asked for with ?include_archived=1.
+        """
+        if self.action == 'retrieve' or (self.action in ARCHIVE_LISTINGS and include_archived(self.request)):
+            return self.archive_queryset.all()
+        return self.queryset.all()
+
+    def get_object(self):
+        """
+        Changing an archived issue (update, assign, delete) moves it back to the issues table first.
+        """
+        try:
+            return super().get_object()
+        except Http404:
+            if not self.restore_archived_issue():
+                raise
+            return super().get_object()
+
+    def restore_archived_issue(self):
+        """
+        Restore the archived issue a write targets. Returns False if there is none, raises
+        PermissionDenied if the user can see it but not change it (403 as for a hot issue).
+        """
+        if self.request.method in SAFE_METHODS:
+            return False
+        try:
+            issue_id = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (TypeError, ValueError):
+            return False
+        if restore_issue(issue_id, user=self.request.user):
+            return True
+        if self.archive_queryset.visible_to(self.request.user).filter(pk=issue_id).exists():
+            # Only the owner or an admin may change an issue (IsOwnerOrReadOnly, assign)
+            raise PermissionDenied(ASSIGN_DENIED if self.action == 'assign' else None)
+        return False
+
+    def apply_search(self, queryset):
+        """
+        Full-text search on title and description with ?q= (e.g. /issues/?q=login+error),
+        results ranked by relevance. See IssueQuerySet.search.
+        """
+        search_terms = self.request.query_params.get('q', '').strip()
+        if search_terms:
+            queryset = queryset.search(search_terms)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Paginated issue list, served from the per-user list cache when possible (see issues/cache.py).
+        Supports conditional GETs (ETag / Last-Modified, see issues/conditional.py), checked before the cache, and
+        sparse fieldsets (?fields=id,title,status) and users in a side table (?user_table=1), see issues/projection.py.
+        """
+        fields = requested_fields(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        return conditional_response(request, queryset, lambda etag: cached_list_response(
+            request, etag, lambda: self.issue_rows_response(queryset, fields)
+        ))
+
+    def issue_rows_response(self, queryset, fields):
+        """
+        Paginated response rendered with the fast read path (values() rows, no serializer per row).
+        """
+        page = self.paginate_queryset(project_issues(queryset, fields))
+        return self.rows_page_response(page, fields)
+
+    def rows_page_response(self, page, fields):
+        """
+        The paginated response for a page of rows, with users in a side table when asked for (?user_table=1).
         """
-        queryset = super().get_queryset()
-        status_filter = self.request.query_params.get('status', None)
+        if not user_table_requested(self.request):
+            return self.get_paginated_response(issue_rows(page, fields))
+        users = {}
+        response = self.get_paginated_response(issue_rows(page, fields, users))
+        response.data['users'] = users
+        return response
 
-        if self.request.user.is_staff: # Admins see all issues
-            if status_filter:
-                queryset = queryset.filter(status__iexact=status_filter)
-            return queryset
-        else: # Regular users see only their owned or assigned issues
-            user_specific_queryset = queryset.filter(
-                Q(owner=self.request.user) | Q(assigned_to=self.request.user)
-            ).distinct() # Use distinct to avoid duplicates if user is both owner and assignee
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Single issue, answered with a 304 when the client's copy is still current.
+        """
+        issue = self.get_object() # Visibility and permissions first: an issue the user can't see is a 404
+        return respond_with_validators(
+            request, *issue_validators(request, issue), lambda: Response(self.get_serializer(issue).data)
+        )
+
+    def partial_update(self, request, *args, **kwargs):
+        """
+        PATCHes of only status and/or assigned_to_id (the Dashboard's status flips) run as one
+        conditional UPDATE (see issues/writes.py). Other bodies, and writes the lean path can't do
+        (missing, archived or not permitted issues, unknown assignees), take the regular update.
+        """
+        response = self.lean_update(patch_changes(request.data))
+        if response is not None:
+            return response
+        return super().partial_update(request, *args, **kwargs)
 
-            if status_filter:
-                user_specific_queryset = user_specific_queryset.filter(status__iexact=status_filter)
-            return user_specific_queryset
+    def lean_update(self, changes):
+        if changes is None:
+            return None
+        issue = update_issue(self.kwargs[self.lookup_url_kwarg or self.lookup_field], self.request.user, changes)
+        return Response(self.get_serializer(issue).data) if issue is not None else None
 
     def perform_create(self, serializer):#if a user create an issue then this method sets that user to owner
         """
@@ -51,43 +183,202 @@ class IssueViewSet(viewsets.ModelViewSet):
         Custom endpoint to fetch issues owned by or assigned to the current user.
         This is essentially what get_queryset does for non-admins, but provided as a specific endpoint.
         """
+        fields = requested_fields(request) # Optional sparse fieldset, e.g. ?fields=id,title,status
+
         #Give me all issues where the owner is the current user OR the issue is assigned_to the current user.
-        user_issues = Issue.objects.filter(
-            Q(owner=request.user) | Q(assigned_to=request.user)
-        ).distinct()
-        
-        status_filter = self.request.query_params.get('status', None) # GET STATUS FROM QUERY PARAMS, If status isn't passed, it defaults to None
-        if status_filter:
-            user_issues = user_issues.filter(status__iexact=status_filter)#If the user passed a status like "open", "Open", or "OPEN" — this will still match "OPEN" in DB
-            
-        serializer = self.get_serializer(user_issues, many=True)#sends issue object in json format m=true because it's a list of users
-        return Response(serializer.data)
+        status_filter = Issue.normalize_status(self.request.query_params.get('status', None)) # GET STATUS FROM QUERY PARAMS, "open", "Open" and "OPEN" all become "OPEN"
+        user_issues = self.apply_search(self.base_queryset().involving(request.user, status=status_filter))
+
+        # 304 without loading any row if the client's copy is current, otherwise served from the
+        # per-user list cache when possible, else the same cursor pagination as the main list,
+        # rows rendered without a serializer per issue
+        return conditional_response(request, user_issues, lambda etag: cached_list_response(
+            request, etag, lambda: self.issue_rows_response(user_issues, fields)
+        ))
 
     @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
     def all_users(self, request):
         """
         Endpoint to get a list of all users. Accessible only by admins.
-        This is useful for populating the "assigned_to" dropdown in the frontend.
+        Unpaginated, pickers should use the user directory (/api/users/?q=) instead.
         """
         users = User.objects.all().order_by('username') # Order for consistent display
         serializer = SimpleUserSerializer(users, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def board(self, request):
+        """
+        Kanban board for the current user's visible issues: /issues/board/?page_size=10
+        Returns each status column with its total count, its newest issues and a 'next' link
+        to load more of that column. Optional 'status' limits the board to one column;
+        page_size=0 returns the counts only. ?fields= picks the issue fields (e.g. without description),
+        ?user_table=1 renders owner/assigned_to as ids with the users once in 'users'.
+        """
+        fields = requested_fields(request)
+        try:
+            page_size = int(request.query_params.get('page_size', self.paginator.page_size))
+        except ValueError:
+            page_size = self.paginator.page_size
+        page_size = max(0, min(page_size, self.paginator.max_page_size))
+
+        status_filter = Issue.normalize_status(request.query_params.get('status', None))
+        visible_issues = self.base_queryset().visible_to(request.user, status=status_filter)
+        users = {} if user_table_requested(request) else None # ?user_table=1, one side table for all columns
+        board = build_board(
+            request, visible_issues, page_size,
+            lambda issues: project_issues(issues, fields),
+            lambda rows: issue_rows(rows, fields, users),
+        )
+        if users is not None:
+            board['users'] = users
+        return Response(board)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def counts(self, request):
+        """
+        Issue counts by status for dashboard headers: {"counts": {"OPEN": 3, ...}, "total": 5}
+        Read from the user's counter row (the totals for admins), no count over the issues. See issues/counters.py.
+        """
+        counts = counts_for(request.user)
+        return Response({'counts': counts, 'total': sum(counts.values())})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def changes(self, request):
+        """
+        Delta sync feed: /issues/changes/?since=<token>
+        Returns the visible issues created or updated after the token, the ids of issues that were
+        deleted or are no longer visible ('removed'), and the token for the next call ('next_since').
+        Call it without 'since' to get a starting token before loading the full list.
+        """
+        try:
+            issues, removed_ids, next_token, has_more = changes_since(
+                self.queryset, request.user, request.query_params.get('since')
+            )
+        except SyncTokenExpired:
+            return Response(
+                {"detail": "Sync token expired, reload the issue list."},
+                status=status.HTTP_410_GONE
+            )
+
+        serializer = self.get_serializer(issues, many=True)
+        return Response({
+            'results': serializer.data,
+            'removed': removed_ids,
+            'next_since': next_token,
+            'has_more': has_more, # More changes are waiting, call again right away with next_since
+        })
+
+    @action(detail=False, methods=['post'], url_path='events/token', permission_classes=[IsAuthenticated])
+    def event_stream_token(self, request):
+        """
+        Token for opening the event stream from a browser (/api/issues/events/?token=...), valid for
+        EVENT_STREAM_TOKEN_MAX_AGE seconds and for nothing else, so the JWT never goes in a URL.
+        Answers 501 when the server doesn't run the stream (not served through ASGI): poll /issues/changes/ then.
+        """
+        if not settings.SERVED_BY_ASGI:
+            return Response(EVENT_STREAM_UNAVAILABLE, status=status.HTTP_501_NOT_IMPLEMENTED)
+        return Response({'token': sign_event_stream_token(request.user), 'expires_in': EVENT_STREAM_TOKEN_MAX_AGE})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream every visible issue: /issues/export/?format=ndjson (default) or ?format=csv.
+        Same visibility rules and filters (status, q) as the list, ?fields= picks the columns.
+        Issues are in id order. See issues/export.py.
+        """
+        rows, encoder = self.export_source()
+        return self.export_response(stream_export(rows, encoder))
+
+    def export_source(self):
+        fields = requested_fields(self.request)
+        rows = project_issues(self.get_queryset(), fields).order_by('id') # Primary key order, no sort of the whole set
+        return rows, EXPORT_ENCODERS[self.request.accepted_renderer.format](fields)
+
+    def export_response(self, content):
+        renderer = self.request.accepted_renderer
+        content_type = renderer.media_type + (f'; charset={renderer.charset}' if renderer.charset else '')
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="issues.{renderer.format}"'
+        return response
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk_create(self, request):
+        """
+        Create many issues in one transaction: {"issues": [{"title": ..., "status": ..., "assigned_to_id": ...}, ...]}
+        The requesting user owns all of them. Returns the created issues in request order.
+        """
+        serializer = BulkIssueCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            issues = bulk_create_issues(request.user, serializer.validated_data['issues'])
+        except AssigneeNotFound:
+            return Response({"detail": "Assigned user not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.get_serializer(issues, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """
+        Change status, assign or delete many issues at once, selected by 'ids' or by a 'filter'
+        (see BulkIssueActionSerializer). Runs as one transaction with set-based UPDATE/DELETE.
+        Only the owner of an issue or an admin can change it; every issue gets a per-item result.
+        """
+        serializer = BulkIssueActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        targets = Issue.objects.visible_to(request.user) # Issues the user can't see are reported as not_found
+        if 'ids' in data:
+            targets = targets.filter(id__in=data['ids'])
+        else:
+            targets = targets.filter(**data['filter'])
+
+        try:
+            results = apply_bulk_action(
+                request.user, targets, data['action'],
+                ids=data.get('ids'), status=data.get('status'), assigned_to_id=data.get('assigned_to_id'),
+            )
+        except AssigneeNotFound:
+            return Response({"detail": "Assigned user not found."}, status=status.HTTP_404_NOT_FOUND)
+        except TooManyIssues:
+            return Response(
+                {"detail": f"The filter matches more than {MAX_BULK_ITEMS} issues, narrow it down."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'results': results})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the issue list cache (per server process), used to size it. Admins only.
+        """
+        return Response(cache_stats())
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def request_stats(self, request):
+        """
+        Per-view latency percentiles (p50/p95/p99), average DB time and query count of the latest
+        requests handled by this server process (see issues/metrics.py). Admins only.
+        """
+        return Response(request_stats())
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])# custom action applies to a single instance for paricular user like with id 5 in pk
     def assign(self, request, pk=None):
         """
         Assign an issue to a user.
         Only the owner of the issue or an admin can assign it.
         Expects 'assigned_to_id' in the request data.
+        Runs as one conditional UPDATE when possible (see partial_update).
         """
+        response = self.lean_update(assign_changes(request.data))
+        if response is not None:
+            return response
+
         issue = self.get_object() # Get the specific issue instance using pk
 
         # Check if the requesting user is the owner of the issue OR an admin
-        if not (issue.owner == request.user or request.user.is_staff):
-            return Response(
-                {"detail": "You do not have permission to assign this issue."},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        if not (issue.owner_id == request.user.id or request.user.is_staff): # Compare ids, no need to load the owner row
+            return Response({"detail": ASSIGN_DENIED}, status=status.HTTP_403_FORBIDDEN)
 
         assigned_to_id = request.data.get('assigned_to_id')#Expects frontend to send the assigned_to_id (user’s ID)
 
@@ -102,4 +393,94 @@ class IssueViewSet(viewsets.ModelViewSet):
 
         issue.save()
         serializer = self.get_serializer(issue)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+class UserDirectoryView(generics.ListAPIView):
+    """
+    Active users for assignee pickers: /api/users/?q=ali&page_size=20
+    Case-insensitive username prefix search, keyset pages, {id, username} rows. See issues/directory.py.
+    Admins only, like /api/issues/all_users/: other users can't enumerate the accounts.
+    """
+    permission_classes = [IsAdminUser]
+    pagination_class = UserDirectoryPagination
+
+    def get_queryset(self):
+        return directory_queryset(self.request.query_params.get('q', ''))
+
+    def list(self, request, *args, **kwargs):
+        def build_data():
+            page = self.paginate_queryset(self.get_queryset())
+            return self.get_paginated_response(directory_rows(page)).data
+
+        return Response(cached_directory_page(request, request.query_params.get('q', ''), build_data))
+
+
+EVENT_STREAM_KEEPALIVE = 15 # Seconds between keep-alive comments, stops proxies from closing idle streams
+EVENT_STREAM_TOKEN_MAX_AGE = 60 # Seconds to connect with a stream token; an open stream isn't cut off
+EVENT_STREAM_TOKEN_SALT = 'issues.events.stream' # Signed for this one purpose
+EVENT_STREAM_UNAVAILABLE = {"detail": "Real-time events need the server to run through ASGI, poll /api/issues/changes/ instead."}
+
+
+def sign_event_stream_token(user):
+    return signing.dumps(user.pk, salt=EVENT_STREAM_TOKEN_SALT)
+
+
+def authenticate_event_stream(request):
+    """
+    Resolve the user of an event stream: a JWT access token in the Authorization header, as for
+    the REST API, or a stream token (IssueViewSet.event_stream_token) as ?token=..., since
+    browsers' EventSource can't send headers.
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    if header:
+        raw_token = authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        try:
+            return authentication.get_user(authentication.get_validated_token(raw_token))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+
+    try:
+        user_id = signing.loads(request.GET.get('token', ''), salt=EVENT_STREAM_TOKEN_SALT, max_age=EVENT_STREAM_TOKEN_MAX_AGE)
+    except signing.BadSignature: # Also expired
+        return None
+    return User.objects.filter(pk=user_id, is_active=True).first()
+
+
+async def issue_events(request):
+    """
+    Server-Sent Events stream of issue changes visible to the current user (/api/issues/events/).
+    One long-lived connection replaces polling; see issues/realtime.py for the event format.
+    Only served through ASGI (asgi.py): a WSGI worker would be blocked for the whole connection,
+    so there it answers 501 and clients poll instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(EVENT_STREAM_UNAVAILABLE, status=501)
+    user = await sync_to_async(authenticate_event_stream)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+
+    broker = get_broker()
+
+    async def stream():
+        subscription = broker.subscribe()
+        try:
+            yield b'retry: 5000\n\n' # Reconnect delay for the browser, in milliseconds
+            while True:
+                event = await subscription.get(timeout=EVENT_STREAM_KEEPALIVE)
+                if event is None:
+                    yield b': keepalive\n\n'
+                    continue
+                message = event_for_user(event, user)
+                if message is not None:
+                    yield format_sse(*message)
+        finally:
+            subscription.close() # Client disconnected
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no' # Don't let nginx buffer the stream
+    return response
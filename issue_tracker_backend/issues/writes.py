@@ -0,0 +1,180 @@
+# issues/writes.py
+"""
+Lean write path for the hot single-issue writes: status flips (PATCH {"status": ...}) and assign.
+
+The regular path loads the issue with get_object(), validates a whole IssueSerializer (with a
+PrimaryKeyRelatedField lookup of the assignee) and save() rewrites every column; assign looks
+the assignee up with a query of its own. Here the write is one conditional UPDATE of the changed
+columns and updated_at, limited to the owner (or staff) and, when assigning, to an existing user:
+
+- On PostgreSQL a single statement does everything: UPDATE ... FROM a locked read of the previous
+  row (SELECT ... FOR UPDATE), joined with the owner and assignee, RETURNING what the response,
+  the counters, the tombstones and the event need.
+- Elsewhere (SQLite) the previous row is read first, in the same transaction.
+
+When no row qualifies (missing, archived, not permitted, unknown assignee) nothing is written and
+update_issue() returns None: the views then run the regular path, which answers with the usual
+errors. post_save is sent as save() sends it, so the receivers (issues/signals.py) invalidate the
+caches, update the counters, write tombstones and publish the event as for any other write.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.db.models import Exists, Subquery
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from .models import Issue
+
+User = get_user_model()
+
+LEAN_FIELDS = {'status', 'assigned_to_id'} # PATCH bodies with only these fields take the lean path
+VALID_STATUSES = {value for value, _ in Issue.STATUS_CHOICES}
+ISSUE_COLUMNS = ('id', 'title', 'description', 'status', 'owner_id', 'assigned_to_id', 'created_at', 'updated_at')
+USER_COLUMNS = ('id', 'username', 'email') # What SimpleUserSerializer renders
+
+
+class NotLean(ValueError):
+    # A value only the serializer can judge (and reject with its usual message)
+    pass
+
+
+def _status(value):
+    status = Issue.normalize_status(value) if isinstance(value, str) else None
+    if status not in VALID_STATUSES:
+        raise NotLean()
+    return status
+
+
+def _assignee_id(value):
+    # Same inputs as the PrimaryKeyRelatedField: null or '' unassigns, ids may be numeric strings
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise NotLean()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise NotLean()
+
+
+def patch_changes(data):
+    """
+    The changes of a PATCH body the lean path can apply, or None when the body needs the serializer.
+    """
+    if not hasattr(data, 'keys') or not data or not set(data.keys()) <= LEAN_FIELDS:
+        return None
+    try:
+        changes = {}
+        if 'status' in data:
+            changes['status'] = _status(data['status'])
+        if 'assigned_to_id' in data:
+            changes['assigned_to_id'] = _assignee_id(data['assigned_to_id'])
+    except NotLean:
+        return None
+    return changes
+
+
+def assign_changes(data):
+    """
+    The change of an /assign/ body (a missing assigned_to_id unassigns), or None for invalid ids.
+    """
+    try:
+        return {'assigned_to_id': _assignee_id(data.get('assigned_to_id') if hasattr(data, 'get') else None)}
+    except NotLean:
+        return None
+
+
+def _user(using, values):
+    return User.from_db(using, USER_COLUMNS, values) if values[0] is not None else None
+
+
+def _update_returning(using, issue_id, user, changes):
+    # PostgreSQL: one statement. The FOR UPDATE read waits for concurrent writers and sees their
+    # committed row, so the previous status and assignee are exact under contention.
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    issues, users = quote(Issue._meta.db_table), quote(User._meta.db_table)
+    assigning = changes.get('assigned_to_id') is not None
+
+    params = list(changes.values()) + [issue_id]
+    sql = [
+        f'UPDATE {issues} AS issue SET {", ".join(f"{quote(column)} = %s" for column in changes)}',
+        f'FROM (SELECT id, owner_id, assigned_to_id, status FROM {issues} WHERE id = %s FOR UPDATE) AS previous',
+        f'INNER JOIN {users} AS owner_user ON owner_user.id = previous.owner_id',
+    ]
+    if 'assigned_to_id' in changes:
+        sql.append(f'LEFT JOIN {users} AS assignee_user ON assignee_user.id = %s')
+        params.append(changes['assigned_to_id'])
+    else:
+        sql.append(f'LEFT JOIN {users} AS assignee_user ON assignee_user.id = previous.assigned_to_id')
+    sql.append('WHERE issue.id = previous.id')
+    if not user.is_staff:
+        sql.append('AND previous.owner_id = %s')
+        params.append(user.pk)
+    if assigning:
+        sql.append('AND assignee_user.id IS NOT NULL') # The assignee exists
+    sql.append(
+        'RETURNING ' + ', '.join(f'issue.{column}' for column in ISSUE_COLUMNS)
+        + ', owner_user.username, owner_user.email, assignee_user.id, assignee_user.username, assignee_user.email,'
+        ' previous.assigned_to_id, previous.status'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('\n'.join(sql), params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    issue = Issue.from_db(using, ISSUE_COLUMNS, row[:8])
+    issue.owner = _user(using, (row[4], row[8], row[9]))
+    issue.assigned_to = _user(using, row[10:13])
+    issue._loaded_values.update(assigned_to_id=row[13], status=row[14]) # The previous values, for the receivers
+    return issue
+
+
+def _read_then_update(using, issue_id, user, changes):
+    issues = Issue.objects.using(using).select_related('owner', 'assigned_to').filter(pk=issue_id)
+    if not user.is_staff:
+        issues = issues.filter(owner=user)
+    target = Issue.objects.using(using).filter(pk=issue_id)
+    assigning = changes.get('assigned_to_id') is not None
+    if assigning:
+        # The new assignee's columns come with the issue; the UPDATE checks it still exists
+        assignee = User.objects.using(using).filter(pk=changes['assigned_to_id'])
+        issues = issues.annotate(**{f'new_assignee_{name}': Subquery(assignee.values(name)) for name in USER_COLUMNS})
+        target = target.filter(Exists(assignee))
+
+    issue = issues.select_for_update().first() # No-op where FOR UPDATE isn't supported
+    if issue is None or (assigning and issue.new_assignee_id is None):
+        return None
+    if not target.update(**changes):
+        return None
+
+    for name, value in changes.items():
+        setattr(issue, name, value) # _loaded_values keeps the previous values for the receivers
+    if assigning:
+        issue.assigned_to = _user(using, (issue.new_assignee_id, issue.new_assignee_username, issue.new_assignee_email))
+    return issue
+
+
+def update_issue(issue_id, user, changes):
+    """
+    Apply `changes` (from patch_changes or assign_changes) to issue `issue_id` for `user` with one
+    conditional UPDATE. Returns the updated issue with owner and assigned_to loaded, or None when
+    nothing was written.
+    """
+    try:
+        issue_id = int(issue_id)
+    except (TypeError, ValueError):
+        return None
+    using = router.db_for_write(Issue)
+    changes = {**changes, 'updated_at': timezone.now()} # update() doesn't apply auto_now
+
+    with transaction.atomic(using=using, savepoint=False):
+        if connections[using].vendor == 'postgresql':
+            issue = _update_returning(using, issue_id, user, changes)
+        else:
+            issue = _read_then_update(using, issue_id, user, changes)
+        if issue is not None:
+            update_fields = frozenset(Issue._meta.get_field(name).name for name in changes)
+            post_save.send(sender=Issue, instance=issue, created=False, update_fields=update_fields, raw=False, using=using)
+    return issue